@@ -1,19 +1,99 @@
 import pandas as pd
+import numpy as np
 import os
 import glob
 
+from csv_format import DATE_FORMAT
+
 folder = "./data"  # change to your folder
 output_file = "processed-data/0-combined_output.csv"
 
-csv_files = glob.glob(os.path.join(folder, "*.csv"))
+# Current Divvy schema (2020-04 onwards)
+SCHEMA = [
+    'ride_id', 'rideable_type', 'started_at', 'ended_at',
+    'start_station_name', 'start_station_id', 'end_station_name', 'end_station_id',
+    'start_lat', 'start_lng', 'end_lat', 'end_lng', 'member_casual',
+]
+
+# Older exports (2019 and earlier, incl. the Q2 2019 "01 - Rental Details ..." headers)
+LEGACY_COLUMNS = {
+    'trip_id': 'ride_id',
+    'start_time': 'started_at',
+    'end_time': 'ended_at',
+    'from_station_id': 'start_station_id',
+    'from_station_name': 'start_station_name',
+    'to_station_id': 'end_station_id',
+    'to_station_name': 'end_station_name',
+    'usertype': 'member_casual',
+    '01 - Rental Details Rental ID': 'ride_id',
+    '01 - Rental Details Local Start Time': 'started_at',
+    '01 - Rental Details Local End Time': 'ended_at',
+    '03 - Rental Start Station ID': 'start_station_id',
+    '03 - Rental Start Station Name': 'start_station_name',
+    '02 - Rental End Station ID': 'end_station_id',
+    '02 - Rental End Station Name': 'end_station_name',
+    'User Type': 'member_casual',
+}
+LEGACY_MEMBER_TYPES = {'Subscriber': 'member', 'Customer': 'casual'}
+LEGACY_RIDEABLE_TYPES = {'docked_bike': 'classic_bike'}
+
+def harmonize(df):
+    """
+    Maps any Divvy export onto the current schema.
+    Legacy files without coordinates get NaN lat/lng (distance and speed stay unknown, and
+    the analysis leaves rows without start_lat out of commute/distance/speed metrics), and pre-2020 trips,
+    which were all docked, become 'classic_bike'.
+    Timestamps are parsed here: exports differ in precision (whole seconds vs milliseconds),
+    so a single guessed format would fail as soon as two exports are mixed.
+    """
+    df = df.rename(columns=LEGACY_COLUMNS)
+    df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
+    if 'rideable_type' not in df.columns:
+        df['rideable_type'] = 'classic_bike'
+    df['rideable_type'] = df['rideable_type'].replace(LEGACY_RIDEABLE_TYPES)
+    df['member_casual'] = df['member_casual'].replace(LEGACY_MEMBER_TYPES)
+    for col in SCHEMA:
+        if col not in df.columns:
+            df[col] = np.nan
+    return df[SCHEMA]
+
+def list_files():
+    csv_files = sorted(glob.glob(os.path.join(folder, "*.csv")))
+    if not csv_files:
+        print(f"ERROR: no CSV files found in '{folder}'.")
+    return csv_files
+
+def load():
+    csv_files = list_files()
+    if not csv_files:
+        return None
+
+    dfs = []
+    for file in csv_files:
+        df = harmonize(pd.read_csv(file))
+        df["source_file"] = os.path.basename(file)
+        dfs.append(df)
+
+    return pd.concat(dfs, ignore_index=True)
 
-dfs = []
-for file in csv_files:
-    df = pd.read_csv(file)
-    df["source_file"] = os.path.basename(file)
-    dfs.append(df)
+def load_chunks(chunksize):
+    """Same rows as load(), streamed as chunks of at most `chunksize` rows (index continues across files)."""
+    offset = 0
+    for file in list_files():
+        for df in pd.read_csv(file, chunksize=chunksize):
+            df = harmonize(df)
+            df["source_file"] = os.path.basename(file)
+            df.index = pd.RangeIndex(offset, offset + len(df))
+            offset += len(df)
+            yield df
 
-combined = pd.concat(dfs, ignore_index=True)
-combined.to_csv(output_file, index=False)
+def run(df):
+    return df
 
-print(f"Saved combined CSV with {len(combined)} rows to {output_file}")
+if __name__ == "__main__":
+    combined = load()
+    if combined is not None:
+        combined = run(combined)
+        combined.to_csv(output_file, index=False, date_format=DATE_FORMAT)
+        print(f"Saved combined CSV with {len(combined)} rows to {output_file}")
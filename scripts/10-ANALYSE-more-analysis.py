@@ -1,56 +1,102 @@
 import pandas as pd
+import os
+
+from duration_stats import HISTOGRAM_MEMORY_BYTES, duration_histograms, histogram_median
 
 # Load the CLEANED file
-file_path = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
-print(f"Loading {file_path}...")
-df = pd.read_csv(file_path)
-
-# --- THE FIX: Convert text columns back to datetime objects ---
-df['started_at'] = pd.to_datetime(df['started_at'])
-df['ended_at'] = pd.to_datetime(df['ended_at'])
-
-# 1. Filter for Weekends ONLY
-print("\n--- WEEKEND DEEP DIVE (Saturday & Sunday) ---")
-# Saturday=5, Sunday=6. If you have a Boolean 'Weekday', False means Weekend.
-weekend_df = df[df['Weekday'] == False].copy()
-print(f"Total Weekend Rides: {len(weekend_df)}")
-
-# 2. Group by Member vs Casual
-grouped = weekend_df.groupby('member_casual')
-
-# 3. Calculate "Leisure Indicators"
-# Calculate duration in minutes
-weekend_df['duration_min'] = (weekend_df['ended_at'] - weekend_df['started_at']).dt.total_seconds() / 60
-
-# Indicator A: Duration Stats (Mean vs Median)
-duration_stats = grouped['duration_min'].agg(['mean', 'median']).round(1)
-duration_stats.columns = ['Avg Duration (min)', 'Median Duration (min)']
-
-# Indicator B: Peak Start Hour (When do they start?)
-# We find the hour with the highest count for each group
-peak_hours = weekend_df.groupby(['member_casual', weekend_df['started_at'].dt.hour])['ride_id'].count()
-
-# FIX: peak_hours['casual'] is already just the hours, so idxmax() returns the hour directly
-peak_casual = peak_hours['casual'].idxmax() 
-peak_member = peak_hours['member'].idxmax()
-
-# Indicator C: Round Trip % (Start Station == End Station)
-# Using distance < 0.05km as a proxy for returning to the same spot
-# (This includes people who undock and redock immediately, but also legitimate round trips)
-round_trip_counts = weekend_df[weekend_df['net_ride_distance_km'] < 0.05].groupby('member_casual').size()
-total_counts = grouped.size()
-round_trip_pct = (round_trip_counts / total_counts * 100).round(2)
-
-# Combine into a summary dataframe
-summary = duration_stats.copy()
-summary['Peak Start Hour'] = [f"{peak_casual}:00", f"{peak_member}:00"]
-summary['Round Trip %'] = round_trip_pct
-
-print(summary.to_string())
-
-# 4. Long Ride Analysis (> 30 mins)
-print("\n--- Long Ride Analysis (> 30 mins) ---")
-long_rides = weekend_df[weekend_df['duration_min'] > 30]
-long_ride_share = (long_rides.groupby('member_casual').size() / total_counts * 100).round(1)
-print("Percentage of Weekend rides that last > 30 minutes:")
-print(long_ride_share)
\ No newline at end of file
+input_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
+output_file = None  # report only
+
+# Fixed-size duration histograms; --memory-budget-mb reserves this
+aggregate_memory_bytes = HISTOGRAM_MEMORY_BYTES
+
+def load():
+    print(f"Loading {input_file}...")
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    return pd.read_csv(input_file)
+
+def aggregate(df, exact_medians=False):
+    """Per-group sums, counts and duration histograms; partial results from chunks can be summed."""
+    # --- THE FIX: Convert text columns back to datetime objects ---
+    df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
+
+    # 1. Filter for Weekends ONLY
+    # Saturday=5, Sunday=6. If you have a Boolean 'Weekday', False means Weekend.
+    weekend_df = df[df['Weekday'] == False].copy()
+
+    # 2. Group by Member vs Casual
+    grouped = weekend_df.groupby('member_casual')
+
+    # 3. Calculate "Leisure Indicators"
+    # Calculate duration in minutes
+    weekend_df['duration_min'] = (weekend_df['ended_at'] - weekend_df['started_at']).dt.total_seconds() / 60
+
+    return {
+        'rides': grouped.size(),
+        'duration_sum': grouped['duration_min'].sum(),
+        'duration_count': grouped['duration_min'].count(),
+        # Medians need every distinct value: keep value counts, not the rows
+        'duration_hist': duration_histograms(weekend_df, exact_medians),
+        'hour_counts': weekend_df.groupby(['member_casual', weekend_df['started_at'].dt.hour])['ride_id'].count(),
+        # Using distance < 0.05km as a proxy for returning to the same spot
+        # (This includes people who undock and redock immediately, but also legitimate round trips)
+        'round_trips': weekend_df[weekend_df['net_ride_distance_km'] < 0.05].groupby('member_casual').size(),
+        # Legacy rides have no coordinates, so no distance: they can't count either way
+        'with_coordinates': weekend_df[weekend_df['start_lat'].notna()].groupby('member_casual').size(),
+        'long_rides': weekend_df[weekend_df['duration_min'] > 30].groupby('member_casual').size(),
+    }
+
+def report(agg):
+    print("\n--- WEEKEND DEEP DIVE (Saturday & Sunday) ---")
+    total_counts = agg['rides'].astype(int)
+    print(f"Total Weekend Rides: {total_counts.sum()}")
+
+    # Indicator A: Duration Stats (Mean vs Median)
+    duration_stats = pd.DataFrame({
+        'mean': agg['duration_sum'] / agg['duration_count'],
+        'median': [histogram_median(agg['duration_hist'][user_type]) / 60 for user_type in agg['duration_sum'].index],
+    }, index=agg['duration_sum'].index).round(1)
+    duration_stats.columns = ['Avg Duration (min)', 'Median Duration (min)']
+
+    # Indicator B: Peak Start Hour (When do they start?)
+    # We find the hour with the highest count for each group
+    peak_hours = agg['hour_counts'].sort_index()
+
+    # FIX: peak_hours['casual'] is already just the hours, so idxmax() returns the hour directly
+    peak_casual = peak_hours['casual'].idxmax()
+    peak_member = peak_hours['member'].idxmax()
+
+    # Indicator C: Round Trip % (Start Station == End Station)
+    with_coordinates = agg['with_coordinates'].reindex(total_counts.index, fill_value=0)
+    round_trip_pct = (agg['round_trips'] / with_coordinates * 100).round(2)
+
+    # Combine into a summary dataframe
+    summary = duration_stats.copy()
+    summary['Peak Start Hour'] = [f"{peak_casual}:00", f"{peak_member}:00"]
+    summary['Round Trip %'] = round_trip_pct
+
+    print(summary.to_string())
+
+    no_coordinates = int((total_counts - with_coordinates).sum())
+    if no_coordinates > 0:
+        print(f"   Note: {no_coordinates} legacy rides without coordinates are left out of the")
+        print("   Round Trip % (counted in the other figures).")
+
+    # 4. Long Ride Analysis (> 30 mins)
+    print("\n--- Long Ride Analysis (> 30 mins) ---")
+    long_ride_share = (agg['long_rides'] / total_counts * 100).round(1)
+    print("Percentage of Weekend rides that last > 30 minutes:")
+    print(long_ride_share)
+
+def run(df):
+    # One in-memory frame: medians from the raw durations, not whole seconds
+    report(aggregate(df, exact_medians=True))
+    return df
+
+if __name__ == '__main__':
+    df = load()
+    if df is not None:
+        run(df)
@@ -1,34 +1,14 @@
 import pandas as pd
-import numpy as np
+import os
+
+from duration_stats import HISTOGRAM_MEMORY_BYTES, duration_histograms, histogram_median
 
 # Load the CLEANED file
-file_path = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
-print(f"Loading {file_path}...")
-df = pd.read_csv(file_path)
-
-# Convert timestamps
-df['started_at'] = pd.to_datetime(df['started_at'])
-df['ended_at'] = pd.to_datetime(df['ended_at'])
-
-# --- 1. FILTER: ISOLATE "NON-COMMUTER" HOURS ---
-print("\n--- ANALYSIS: DURATION BREAKDOWN (OFF-PEAK) ---")
-print("Excluding Weekday Rush Hours (06-10 & 17-20)...")
-
-# Define Commuter Hours (to EXCLUDE)
-# Rush Hour = Weekdays (Mon=0 to Fri=4) AND (Hour 6-9 OR Hour 17-19)
-# Note: range(6, 10) is 6,7,8,9.
-is_weekday = df['started_at'].dt.dayofweek < 5
-hour = df['started_at'].dt.hour
-is_rush_hour = (hour >= 6) & (hour < 10) | (hour >= 17) & (hour < 20)
-is_commute_time = is_weekday & is_rush_hour
-
-# We want the OPPOSITE (Off-Peak)
-off_peak_df = df[~is_commute_time].copy()
-print(f"Analyzing {len(off_peak_df)} Off-Peak rides.")
-
-# --- 2. BINNING DURATIONS ---
-# Calculate duration in minutes
-off_peak_df['duration_min'] = (off_peak_df['ended_at'] - off_peak_df['started_at']).dt.total_seconds() / 60
+input_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
+output_file = None  # report only
+
+# Fixed-size duration histograms; --memory-budget-mb reserves this
+aggregate_memory_bytes = HISTOGRAM_MEMORY_BYTES
 
 # Define Bins for "Short Hops" vs "Long Rides"
 # 0-5 mins: "Micro-Trip" (e.g., to bus stop)
@@ -38,26 +18,83 @@ off_peak_df['duration_min'] = (off_peak_df['ended_at'] - off_peak_df['started_at
 bins = [0, 5, 10, 20, 30, 60, 9999]
 labels = ['0-5m', '5-10m', '10-20m', '20-30m', '30-60m', '60m+']
 
-off_peak_df['duration_bin'] = pd.cut(off_peak_df['duration_min'], bins=bins, labels=labels)
+def load():
+    print(f"Loading {input_file}...")
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    return pd.read_csv(input_file)
+
+def aggregate(df, exact_medians=False):
+    """Per-group bin counts, sums and duration histograms; partial results from chunks can be summed."""
+    # Convert timestamps
+    df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
+
+    # --- 1. FILTER: ISOLATE "NON-COMMUTER" HOURS ---
+    # Define Commuter Hours (to EXCLUDE)
+    # Rush Hour = Weekdays (Mon=0 to Fri=4) AND (Hour 6-9 OR Hour 17-19)
+    # Note: range(6, 10) is 6,7,8,9.
+    is_weekday = df['started_at'].dt.dayofweek < 5
+    hour = df['started_at'].dt.hour
+    is_rush_hour = (hour >= 6) & (hour < 10) | (hour >= 17) & (hour < 20)
+    is_commute_time = is_weekday & is_rush_hour
+
+    # We want the OPPOSITE (Off-Peak)
+    off_peak_df = df[~is_commute_time].copy()
+
+    # --- 2. BINNING DURATIONS ---
+    # Calculate duration in minutes
+    off_peak_df['duration_min'] = (off_peak_df['ended_at'] - off_peak_df['started_at']).dt.total_seconds() / 60
+    off_peak_df['duration_bin'] = pd.cut(off_peak_df['duration_min'], bins=bins, labels=labels)
+
+    # Group by User Type and Bin
+    bin_counts = off_peak_df.groupby(['member_casual', 'duration_bin'], observed=False).size().unstack()
+    bin_counts.columns = bin_counts.columns.astype(str)
+
+    grouped = off_peak_df.groupby('member_casual')
+    return {
+        'rides': grouped.size(),
+        'bin_counts': bin_counts,
+        'duration_sum': grouped['duration_min'].sum(),
+        'duration_count': grouped['duration_min'].count(),
+        # Medians need every distinct value: keep value counts, not the rows
+        'duration_hist': duration_histograms(off_peak_df, exact_medians),
+    }
+
+def report(agg):
+    print("\n--- ANALYSIS: DURATION BREAKDOWN (OFF-PEAK) ---")
+    print("Excluding Weekday Rush Hours (06-10 & 17-20)...")
+    total_counts = agg['rides'].astype(int)
+    print(f"Analyzing {total_counts.sum()} Off-Peak rides.")
+
+    # --- 3. CALCULATE PERCENTAGES ---
+    # Calculate percentage within each user group
+    percentages = agg['bin_counts'].reindex(columns=labels).div(total_counts, axis=0) * 100
 
-# --- 3. CALCULATE PERCENTAGES ---
-# Group by User Type and Bin
-grouped = off_peak_df.groupby(['member_casual', 'duration_bin'], observed=False).size().reset_index(name='count')
+    # Pivot for cleaner display
+    pivot_table = percentages.round(2).T
+    pivot_table.index.name = 'duration_bin'
+    pivot_table.columns.name = 'member_casual'
 
-# Calculate percentage within each user group
-# We merge total counts back to divide
-total_counts = off_peak_df.groupby('member_casual').size().reset_index(name='total')
-grouped = grouped.merge(total_counts, on='member_casual')
-grouped['percentage'] = (grouped['count'] / grouped['total'] * 100).round(2)
+    print("\nPERCENTAGE OF RIDES BY DURATION (OFF-PEAK ONLY)")
+    print(pivot_table.to_string())
 
-# Pivot for cleaner display
-pivot_table = grouped.pivot(index='duration_bin', columns='member_casual', values='percentage')
+    # --- 4. SUMMARY STATS (MEAN/MEDIAN) ---
+    stats = pd.DataFrame({
+        'mean': agg['duration_sum'] / agg['duration_count'],
+        'median': [histogram_median(agg['duration_hist'][user_type]) / 60 for user_type in agg['duration_sum'].index],
+    }, index=agg['duration_sum'].index).round(1)
+    stats.columns = ['Avg Duration (min)', 'Median Duration (min)']
+    print("\nSUMMARY STATS (OFF-PEAK)")
+    print(stats.to_string())
 
-print("\nPERCENTAGE OF RIDES BY DURATION (OFF-PEAK ONLY)")
-print(pivot_table.to_string())
+def run(df):
+    # One in-memory frame: medians from the raw durations, not whole seconds
+    report(aggregate(df, exact_medians=True))
+    return df
 
-# --- 4. SUMMARY STATS (MEAN/MEDIAN) ---
-stats = off_peak_df.groupby('member_casual')['duration_min'].agg(['mean', 'median']).round(1)
-stats.columns = ['Avg Duration (min)', 'Median Duration (min)']
-print("\nSUMMARY STATS (OFF-PEAK)")
-print(stats.to_string())
\ No newline at end of file
+if __name__ == '__main__':
+    df = load()
+    if df is not None:
+        run(df)
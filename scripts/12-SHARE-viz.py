@@ -6,151 +6,180 @@ import os
 # --- CONFIGURATION ---
 input_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
 output_dir = 'visualizations'
+output_file = None  # charts only
 
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
-
-print(f"Loading {input_file}...")
-df = pd.read_csv(input_file)
-
-# Convert timestamps
-df['started_at'] = pd.to_datetime(df['started_at'])
-df['ended_at'] = pd.to_datetime(df['ended_at'])
-
-# --- CATEGORIZATION LOGIC ---
-print("Categorizing Rides...")
-
-# 1. Define Helper Columns
-df['duration_min'] = (df['ended_at'] - df['started_at']).dt.total_seconds() / 60
-df['Weekday'] = df['started_at'].dt.dayofweek < 5 # True=Mon-Fri
-hour = df['started_at'].dt.hour
-is_rush_hour = (hour >= 6) & (hour < 10) | (hour >= 17) & (hour < 20)
-df['is_commute_time'] = df['Weekday'] & is_rush_hour
-
-# 2. Define Categories (Priority Based)
-def categorize_ride(row):
-    # Category 1: Commute (Already rigorously defined in 'commut' column)
-    if row['commut']:
-        return 'Commute'
-    
-    # Category 2: Weekend Joy Ride (Weekend + >30 mins)
-    if (not row['Weekday']) and (row['duration_min'] > 30):
-        return 'Weekend Joy Ride'
-    
-    # Category 3: Short Snap (Outside Commute Time + <10 mins)
-    # Note: 'Outside Commute Time' includes all Weekends and Off-Peak Weekdays
-    if (not row['is_commute_time']) and (row['duration_min'] < 10):
-        return 'Short Snap (<10m)'
-    
-    # Category 4: Other
-    return 'Other'
-
-# Apply categorization (this might take a few seconds on large data)
-# Optimization: Vectorized approach is faster than .apply
-conditions = [
-    (df['commut'] == True),
-    (df['Weekday'] == False) & (df['duration_min'] > 30),
-    (df['is_commute_time'] == False) & (df['duration_min'] < 10)
-]
-choices = ['Commute', 'Weekend Joy Ride', 'Short Snap (<10m)']
-df['ride_category'] = np.select(conditions, choices, default='Other')
-
-# =============================================================================
-# CHART 1: PIE CHARTS (Member vs Casual)
-# =============================================================================
-print("Generating Pie Charts...")
-
-# Group by User Type and Category
-pie_data = df.groupby(['member_casual', 'ride_category']).size().unstack(fill_value=0)
-
-# Colors
-colors = {
-    'Commute': '#2ecc71',           # Green (Money/Go)
-    'Short Snap (<10m)': '#3498db', # Blue (Quick/Utility)
-    'Weekend Joy Ride': '#e67e22',  # Orange (Leisure/Fun)
-    'Other': '#bdc3c7'              # Grey
-}
-category_order = ['Commute', 'Short Snap (<10m)', 'Weekend Joy Ride', 'Other']
-color_list = [colors[cat] for cat in category_order]
-
-fig, axes = plt.subplots(1, 2, figsize=(14, 7))
-fig.suptitle('Trip Type Segmentation: How They Use the Bikes', fontsize=16, fontweight='bold')
-
-# Function to make the pie chart
-def make_pie(ax, user_type, title):
-    data = pie_data.loc[user_type].reindex(category_order)
-    wedges, texts, autotexts = ax.pie(
-        data, 
-        labels=data.index, 
-        autopct='%1.1f%%', 
-        startangle=90, 
-        colors=color_list,
-        pctdistance=0.85,
-        explode=[0.05, 0.05, 0.05, 0] # Explode the key segments slightly
-    )
-    
-    # Styling text
-    for text in texts:
-        text.set_fontsize(10)
-    for autotext in autotexts:
-        autotext.set_color('white')
-        autotext.set_fontweight('bold')
-        
-    # Draw circle for Donut chart look (optional, but looks cleaner)
-    centre_circle = plt.Circle((0,0),0.70,fc='white')
-    ax.add_artist(centre_circle)
-    
-    ax.set_title(title, fontsize=14, fontweight='bold', color='#2c3e50')
-
-# Plot Member
-make_pie(axes[0], 'member', 'MEMBERS\n(Efficient & Routine)')
-
-# Plot Casual
-make_pie(axes[1], 'casual', 'CASUALS\n(Leisure & Potential)')
-
-plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-plt.savefig(f"{output_dir}/pie_charts.png", dpi=300)
-plt.close()
-
-
-# =============================================================================
-# CHART 2: THE UTILITY CURVE
-# =============================================================================
-print("Generating Utility Curve...")
-
-# Filter for Off-Peak only
-off_peak_df = df[~df['is_commute_time']].copy()
-
-# Bins
+# Utility curve bins (off-peak ride duration, minutes)
 bins = [0, 5, 10, 20, 30, 60]
 labels = ['0-5', '5-10', '10-20', '20-30', '30-60']
-off_peak_df['duration_bin'] = pd.cut(off_peak_df['duration_min'], bins=bins, labels=labels)
-
-# Calculate %
-dist_data = off_peak_df.groupby(['member_casual', 'duration_bin'], observed=False).size().reset_index(name='count')
-totals = off_peak_df.groupby('member_casual').size().reset_index(name='total')
-dist_data = dist_data.merge(totals, on='member_casual')
-dist_data['pct'] = (dist_data['count'] / dist_data['total'] * 100)
-pivot = dist_data.pivot(index='duration_bin', columns='member_casual', values='pct')
-
-# Plot
-fig, ax = plt.subplots(figsize=(12, 6))
-x = np.arange(len(labels))
-width = 0.35
-
-ax.bar(x - width/2, pivot['member'], width, label='Member', color='#2980b9')
-ax.bar(x + width/2, pivot['casual'], width, label='Casual', color='#95a5a6')
-
-ax.set_title('Ride Duration Distribution (Off-Peak Hours Only)', fontsize=14, fontweight='bold')
-ax.set_xlabel('Ride Duration (Minutes)')
-ax.set_ylabel('Percentage of Rides')
-ax.set_xticks(x)
-ax.set_xticklabels(labels)
-ax.legend()
-
-plt.savefig(f"{output_dir}/utility_curve.png", dpi=300)
-plt.close()
-
-print(f"--- DONE ---")
-print(f"Pie Charts saved to: {output_dir}/simplified_pie_charts.png")
-print(f"Utility Curve saved to: {output_dir}/utility_curve.png")
\ No newline at end of file
+
+def load():
+    print(f"Loading {input_file}...")
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    return pd.read_csv(input_file)
+
+def aggregate(df):
+    """Category and duration-bin counts per user type; partial results from chunks can be summed."""
+    # Convert timestamps
+    df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
+
+    # --- CATEGORIZATION LOGIC ---
+    print("Categorizing Rides...")
+
+    # 1. Define Helper Columns
+    df['duration_min'] = (df['ended_at'] - df['started_at']).dt.total_seconds() / 60
+    df['Weekday'] = df['started_at'].dt.dayofweek < 5 # True=Mon-Fri
+    hour = df['started_at'].dt.hour
+    is_rush_hour = (hour >= 6) & (hour < 10) | (hour >= 17) & (hour < 20)
+    df['is_commute_time'] = df['Weekday'] & is_rush_hour
+
+    # 2. Define Categories (Priority Based)
+    def categorize_ride(row):
+        # Category 1: Commute (Already rigorously defined in 'commut' column)
+        if row['commut']:
+            return 'Commute'
+
+        # Category 2: Weekend Joy Ride (Weekend + >30 mins)
+        if (not row['Weekday']) and (row['duration_min'] > 30):
+            return 'Weekend Joy Ride'
+
+        # Category 3: Short Snap (Outside Commute Time + <10 mins)
+        # Note: 'Outside Commute Time' includes all Weekends and Off-Peak Weekdays
+        if (not row['is_commute_time']) and (row['duration_min'] < 10):
+            return 'Short Snap (<10m)'
+
+        # Category 4: Other
+        return 'Other'
+
+    # Apply categorization (this might take a few seconds on large data)
+    # Optimization: Vectorized approach is faster than .apply
+    conditions = [
+        (df['commut'] == True),
+        (df['Weekday'] == False) & (df['duration_min'] > 30),
+        (df['is_commute_time'] == False) & (df['duration_min'] < 10)
+    ]
+    choices = ['Commute', 'Weekend Joy Ride', 'Short Snap (<10m)']
+    df['ride_category'] = np.select(conditions, choices, default='Other')
+    # Legacy rides have no coordinates, so stage 7 leaves commut missing: without
+    # knowing whether they were commutes they can't go in any slice
+    classified = df['commut'].notna()
+
+    # Filter for Off-Peak only (Chart 2)
+    off_peak_df = df[~df['is_commute_time']].copy()
+    off_peak_df['duration_bin'] = pd.cut(off_peak_df['duration_min'], bins=bins, labels=labels)
+    bin_counts = off_peak_df.groupby(['member_casual', 'duration_bin'], observed=False).size().unstack()
+    bin_counts.columns = bin_counts.columns.astype(str)
+
+    return {
+        'category_counts': df[classified].groupby(['member_casual', 'ride_category']).size(),
+        'unclassified': int((~classified).sum()),
+        'off_peak_bin_counts': bin_counts,
+        'off_peak_totals': off_peak_df.groupby('member_casual').size(),
+    }
+
+def report(agg):
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # =============================================================================
+    # CHART 1: PIE CHARTS (Member vs Casual)
+    # =============================================================================
+    print("Generating Pie Charts...")
+
+    # Group by User Type and Category
+    pie_data = agg['category_counts'].unstack(fill_value=0)
+    if agg['unclassified'] > 0:
+        print(f"   Note: {agg['unclassified']} legacy rides without coordinates are left out of the")
+        print("   pie charts (counted in the utility curve).")
+
+    # Colors
+    colors = {
+        'Commute': '#2ecc71',           # Green (Money/Go)
+        'Short Snap (<10m)': '#3498db', # Blue (Quick/Utility)
+        'Weekend Joy Ride': '#e67e22',  # Orange (Leisure/Fun)
+        'Other': '#bdc3c7'              # Grey
+    }
+    category_order = ['Commute', 'Short Snap (<10m)', 'Weekend Joy Ride', 'Other']
+    color_list = [colors[cat] for cat in category_order]
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 7))
+    fig.suptitle('Trip Type Segmentation: How They Use the Bikes', fontsize=16, fontweight='bold')
+
+    # Function to make the pie chart
+    def make_pie(ax, user_type, title):
+        data = pie_data.loc[user_type].reindex(category_order)
+        wedges, texts, autotexts = ax.pie(
+            data, 
+            labels=data.index, 
+            autopct='%1.1f%%', 
+            startangle=90, 
+            colors=color_list,
+            pctdistance=0.85,
+            explode=[0.05, 0.05, 0.05, 0] # Explode the key segments slightly
+        )
+
+        # Styling text
+        for text in texts:
+            text.set_fontsize(10)
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
+
+        # Draw circle for Donut chart look (optional, but looks cleaner)
+        centre_circle = plt.Circle((0,0),0.70,fc='white')
+        ax.add_artist(centre_circle)
+
+        ax.set_title(title, fontsize=14, fontweight='bold', color='#2c3e50')
+
+    # Plot Member
+    make_pie(axes[0], 'member', 'MEMBERS\n(Efficient & Routine)')
+
+    # Plot Casual
+    make_pie(axes[1], 'casual', 'CASUALS\n(Leisure & Potential)')
+
+    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    plt.savefig(f"{output_dir}/pie_charts.png", dpi=300)
+    plt.close()
+
+
+    # =============================================================================
+    # CHART 2: THE UTILITY CURVE
+    # =============================================================================
+    print("Generating Utility Curve...")
+
+    # Calculate %
+    pivot = (agg['off_peak_bin_counts'].reindex(columns=labels)
+             .div(agg['off_peak_totals'], axis=0) * 100).T
+
+    # Plot
+    fig, ax = plt.subplots(figsize=(12, 6))
+    x = np.arange(len(labels))
+    width = 0.35
+
+    ax.bar(x - width/2, pivot['member'], width, label='Member', color='#2980b9')
+    ax.bar(x + width/2, pivot['casual'], width, label='Casual', color='#95a5a6')
+
+    ax.set_title('Ride Duration Distribution (Off-Peak Hours Only)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Ride Duration (Minutes)')
+    ax.set_ylabel('Percentage of Rides')
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels)
+    ax.legend()
+
+    plt.savefig(f"{output_dir}/utility_curve.png", dpi=300)
+    plt.close()
+
+    print(f"--- DONE ---")
+    print(f"Pie Charts saved to: {output_dir}/simplified_pie_charts.png")
+    print(f"Utility Curve saved to: {output_dir}/utility_curve.png")
+
+def run(df):
+    report(aggregate(df))
+    return df
+
+if __name__ == '__main__':
+    df = load()
+    if df is not None:
+        run(df)
@@ -0,0 +1,113 @@
+"""
+Divvy Fleet Concurrency Analysis
+--------------------------------
+Description:
+    Answers "how many bikes are in use at the same time?" for every minute
+    of the year. Each ride becomes a +1 event at its start minute and a -1
+    event the minute after it ends. Counting the events per minute (a
+    counting sort on the minute index) and taking the cumulative sum sweeps
+    the whole year in one pass, so no per-minute interval joins are needed.
+
+    A ride counts as "in use" for every minute from floor(started_at) to
+    floor(ended_at), inclusive.
+
+Output:
+    - Per-minute concurrency for the fleet, each rideable_type and each
+      member_casual group (CSV).
+    - Peak concurrency tables by hour of day and by weekday.
+"""
+
+import pandas as pd
+import numpy as np
+import os
+
+# --- CONFIGURATION ---
+input_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
+concurrency_output_file = 'processed-data/concurrency_by_minute.csv'
+output_file = None  # results only
+
+SPLIT_COLUMNS = ['rideable_type', 'member_casual']
+WEEKDAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def concurrency_curve(start_idx, end_idx, n_minutes):
+    """
+    Sweep-line count of active rides per minute.
+    start_idx / end_idx are integer minute offsets (end inclusive).
+    """
+    starts = np.bincount(start_idx, minlength=n_minutes + 1)
+    ends = np.bincount(end_idx + 1, minlength=n_minutes + 1)
+    return np.cumsum(starts - ends)[:n_minutes]
+
+
+def load():
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    df = pd.read_csv(input_file)
+    print(f"Loaded {len(df)} rows.")
+    return df
+
+
+def run(df):
+    df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
+
+    # 1. Convert timestamps to integer minute offsets from the first ride
+    start_minute = df['started_at'].dt.floor('min')
+    end_minute = df['ended_at'].dt.floor('min')
+    origin = start_minute.min()
+
+    start_idx = ((start_minute - origin) // pd.Timedelta(minutes=1)).to_numpy(dtype=np.int64)
+    end_idx = ((end_minute - origin) // pd.Timedelta(minutes=1)).to_numpy(dtype=np.int64)
+
+    # Safety net: a ride can never end before it starts (cleaned data should already satisfy this)
+    end_idx = np.maximum(end_idx, start_idx)
+
+    n_minutes = int(end_idx.max()) + 1
+    timeline = pd.date_range(origin, periods=n_minutes, freq='min')
+    print(f"Sweeping {n_minutes} minutes ({timeline[0]} -> {timeline[-1]})...")
+
+    # 2. Fleet-wide curve
+    concurrency = pd.DataFrame(index=timeline)
+    concurrency.index.name = 'minute'
+    concurrency['All Rides'] = concurrency_curve(start_idx, end_idx, n_minutes)
+
+    # 3. Curves per rideable_type and member_casual
+    for col in SPLIT_COLUMNS:
+        for value in sorted(df[col].dropna().unique()):
+            mask = (df[col] == value).to_numpy()
+            concurrency[value] = concurrency_curve(start_idx[mask], end_idx[mask], n_minutes)
+
+    # 4. Overall peaks
+    print("\n--- PEAK CONCURRENT RIDES ---")
+    peaks = pd.DataFrame({
+        'Peak Rides': concurrency.max(),
+        'Peak Minute': concurrency.idxmax(),
+        'Avg Rides': concurrency.mean().round(1),
+    })
+    print(peaks.to_string())
+
+    # 5. Peak concurrency by hour of day
+    print("\n--- PEAK CONCURRENT RIDES BY HOUR ---")
+    peak_by_hour = concurrency.groupby(concurrency.index.hour).max()
+    peak_by_hour.index.name = 'Hour'
+    print(peak_by_hour.to_string())
+
+    # 6. Peak concurrency by weekday
+    print("\n--- PEAK CONCURRENT RIDES BY WEEKDAY ---")
+    peak_by_weekday = concurrency.groupby(concurrency.index.day_name()).max().reindex(WEEKDAY_ORDER)
+    peak_by_weekday.index.name = 'Weekday'
+    print(peak_by_weekday.to_string())
+
+    # 7. Save
+    concurrency.to_csv(concurrency_output_file)
+    print(f"\n--- Done! Saved per-minute concurrency to '{concurrency_output_file}' ---")
+    return df
+
+
+if __name__ == '__main__':
+    print(f"--- Starting Concurrency Analysis ---")
+    df = load()
+    if df is not None:
+        run(df)
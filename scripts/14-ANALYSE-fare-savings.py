@@ -0,0 +1,207 @@
+"""
+Divvy Fare Engine: Casual vs Member Pricing
+-------------------------------------------
+Description:
+    Prices every ride under both the casual (pay-per-ride) and the annual
+    member tariff to put a number on "That ride cost you $X. With an Annual
+    Membership, it would have been included."
+
+    Tariffs are versioned: each row of TARIFFS applies to one scenario and
+    rideable_type from its effective_from month until the next version.
+    Rides are matched to their tariff with a single as-of merge, so both
+    plans are priced in one vectorized pass per scenario. Add a scenario to
+    TARIFFS to compare alternative pricing without touching the logic.
+
+Pricing rules:
+    - Billed minutes = ride duration rounded UP to the next whole minute.
+    - Cost = unlock_fee + per_minute * max(0, billed minutes - included minutes)
+
+Output:
+    - Savings by member_casual x ride category (Commute / Short Snap / ...).
+    - Recurring casual commute routes (same stations, same rush window)
+      ranked by how much they would have saved with a membership.
+
+Note:
+    Prices below approximate the published Divvy rates for 12/2024-11/2025.
+    Check divvybikes.com/pricing before quoting figures externally.
+    Rides that started before a scenario's first tariff version are counted
+    and skipped; add older tariff rows to price multi-year history.
+"""
+
+import pandas as pd
+import numpy as np
+import os
+
+# --- CONFIGURATION ---
+input_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
+segment_output_file = 'processed-data/fare_savings_by_segment.csv'
+pattern_output_file = 'processed-data/fare_savings_by_commute_pattern.csv'
+output_file = None  # results only
+
+ANNUAL_MEMBERSHIP_FEE = 143.90
+
+# Recurring pattern = same start/end station in the same rush window, seen at least this often
+MIN_PATTERN_RIDES = 10
+
+# One row per (scenario, effective_from, rideable_type). Both plans side by side.
+TARIFFS = pd.DataFrame([
+    # scenario,  effective_from, rideable_type,    casual: unlock, per_min, incl | member: unlock, per_min, incl
+    ('current',  '2024-12',      'classic_bike',     1.00, 0.18,  0,             0.00, 0.18, 45),
+    ('current',  '2024-12',      'electric_bike',    1.00, 0.44,  0,             0.00, 0.18,  0),
+    ('current',  '2024-12',      'electric_scooter', 1.00, 0.44,  0,             0.00, 0.18,  0),
+    ('current',  '2025-03',      'classic_bike',     1.00, 0.19,  0,             0.00, 0.19, 45),
+    ('current',  '2025-03',      'electric_bike',    1.00, 0.44,  0,             0.00, 0.19,  0),
+    ('current',  '2025-03',      'electric_scooter', 1.00, 0.44,  0,             0.00, 0.19,  0),
+    # Example what-if: members get the first 15 e-bike/scooter minutes included
+    ('member_ebike_15min', '2024-12', 'classic_bike',     1.00, 0.19, 0,       0.00, 0.19, 45),
+    ('member_ebike_15min', '2024-12', 'electric_bike',    1.00, 0.44, 0,       0.00, 0.19, 15),
+    ('member_ebike_15min', '2024-12', 'electric_scooter', 1.00, 0.44, 0,       0.00, 0.19, 15),
+], columns=[
+    'scenario', 'effective_from', 'rideable_type',
+    'casual_unlock_fee', 'casual_per_minute', 'casual_included_minutes',
+    'member_unlock_fee', 'member_per_minute', 'member_included_minutes',
+])
+
+PLANS = ['casual', 'member']
+
+
+def price_rides(rides, tariffs):
+    """
+    Prices every ride under both plans for one tariff scenario.
+    Returns a DataFrame (aligned to rides.index) with casual_cost, member_cost and savings.
+    """
+    tariffs = tariffs.copy()
+    tariffs['effective_from'] = pd.to_datetime(tariffs['effective_from']).astype('datetime64[ns]')
+    tariffs = tariffs.sort_values('effective_from')
+
+    # merge_asof needs both sides sorted on the time key; keep the original index to restore order
+    keys = rides[['started_at', 'rideable_type']].copy()
+    keys['started_at'] = keys['started_at'].astype('datetime64[ns]')
+    keys['row'] = np.arange(len(keys))
+    keys = keys.sort_values('started_at')
+
+    matched = pd.merge_asof(
+        keys, tariffs,
+        left_on='started_at', right_on='effective_from',
+        by='rideable_type', direction='backward'
+    ).sort_values('row')
+
+    billed_minutes = np.ceil(rides['duration_min'].to_numpy() - 1e-9).clip(min=0)
+
+    prices = pd.DataFrame(index=rides.index)
+    for plan in PLANS:
+        chargeable = np.maximum(billed_minutes - matched[f'{plan}_included_minutes'].to_numpy(), 0)
+        prices[f'{plan}_cost'] = (
+            matched[f'{plan}_unlock_fee'].to_numpy()
+            + matched[f'{plan}_per_minute'].to_numpy() * chargeable
+        )
+    prices['savings'] = prices['casual_cost'] - prices['member_cost']
+    return prices
+
+
+def load():
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    df = pd.read_csv(input_file)
+    print(f"Loaded {len(df)} rows.")
+    return df
+
+
+def run(df):
+    df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
+
+    # 1. Helper columns (same categories as 12-SHARE-viz.py)
+    df['duration_min'] = (df['ended_at'] - df['started_at']).dt.total_seconds() / 60
+    df['Weekday'] = df['started_at'].dt.dayofweek < 5
+    hour = df['started_at'].dt.hour
+    is_morning = (hour >= 6) & (hour < 10)
+    is_evening = (hour >= 17) & (hour < 20)
+    is_commute_time = df['Weekday'] & (is_morning | is_evening)
+
+    conditions = [
+        (df['commut'] == True),
+        (df['Weekday'] == False) & (df['duration_min'] > 30),
+        (is_commute_time == False) & (df['duration_min'] < 10)
+    ]
+    choices = ['Commute', 'Weekend Joy Ride', 'Short Snap (<10m)']
+    df['ride_category'] = np.select(conditions, choices, default='Other')
+    df['rush_window'] = np.where(is_morning, 'AM', 'PM')
+
+    segment_tables = []
+    pattern_tables = []
+
+    for scenario, tariffs in TARIFFS.groupby('scenario', sort=False):
+        print(f"\n=== SCENARIO: {scenario} ===")
+
+        # Rides without a tariff in this scenario (unknown rideable_type) can't be priced
+        unpriced = ~df['rideable_type'].isin(tariffs['rideable_type'].unique())
+        rides = df
+        if unpriced.any():
+            print(f"Skipping {unpriced.sum()} rides with no tariff for their rideable_type.")
+            rides = df[~unpriced]
+
+        # Rides that started before the scenario's first tariff version can't be priced either
+        first_tariff = pd.to_datetime(tariffs.groupby('rideable_type')['effective_from'].min())
+        in_effect = rides['started_at'] >= rides['rideable_type'].map(first_tariff)
+        scenario_rides = rides
+        if not in_effect.all():
+            print(f"Skipping {(~in_effect).sum()} rides with no tariff in effect "
+                  f"(started before {first_tariff.min():%Y-%m}).")
+            scenario_rides = rides[in_effect]
+
+        # 2. Price every ride under both plans
+        prices = price_rides(scenario_rides, tariffs)
+        priced = pd.concat([scenario_rides[['member_casual', 'ride_category', 'commut', 'rush_window',
+                                         'start_station_name', 'end_station_name']], prices], axis=1)
+
+        # 3. Savings per segment
+        segments = priced.groupby(['member_casual', 'ride_category']).agg(
+            rides=('savings', 'size'),
+            avg_casual_cost=('casual_cost', 'mean'),
+            avg_member_cost=('member_cost', 'mean'),
+            avg_savings=('savings', 'mean'),
+            total_savings=('savings', 'sum'),
+        ).round(2).reset_index()
+        segments.insert(0, 'scenario', scenario)
+        segment_tables.append(segments)
+
+        print("\n1. Average price per ride by segment ($):")
+        print(segments.drop(columns='scenario').to_string(index=False))
+
+        # 4. Recurring casual commute routes
+        # There is no rider ID in the public data, so a "pattern" is a route + rush window
+        commutes = priced[(priced['member_casual'] == 'casual') & (priced['commut'] == True)]
+        patterns = commutes.groupby(
+            ['start_station_name', 'end_station_name', 'rush_window']
+        ).agg(
+            rides=('savings', 'size'),
+            avg_casual_cost=('casual_cost', 'mean'),
+            total_savings=('savings', 'sum'),
+        ).reset_index()
+        patterns = patterns[patterns['rides'] >= MIN_PATTERN_RIDES]
+        patterns['memberships_paid_for'] = patterns['total_savings'] / ANNUAL_MEMBERSHIP_FEE
+        patterns = patterns.sort_values('total_savings', ascending=False).round(2)
+        patterns.insert(0, 'scenario', scenario)
+        pattern_tables.append(patterns)
+
+        print(f"\n2. Top recurring casual commute routes (>= {MIN_PATTERN_RIDES} rides):")
+        print(patterns.drop(columns='scenario').head(10).to_string(index=False))
+
+        casual_commute_savings = commutes['savings'].sum()
+        print(f"\nCasual commute rides would have saved ${casual_commute_savings:,.2f} in total "
+              f"({casual_commute_savings / ANNUAL_MEMBERSHIP_FEE:,.0f} annual memberships' worth).")
+
+    # 5. Save
+    pd.concat(segment_tables, ignore_index=True).to_csv(segment_output_file, index=False)
+    pd.concat(pattern_tables, ignore_index=True).to_csv(pattern_output_file, index=False)
+    print(f"\n--- Done! Saved to '{segment_output_file}' and '{pattern_output_file}' ---")
+    return df
+
+
+if __name__ == '__main__':
+    print(f"--- Starting Fare Engine ---")
+    df = load()
+    if df is not None:
+        run(df)
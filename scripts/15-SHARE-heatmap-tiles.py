@@ -0,0 +1,154 @@
+"""
+Divvy Spatial Heatmaps & Tile Export
+------------------------------------
+Description:
+    Bins ride start and end points into a regular grid at several zoom
+    levels and exports the aggregates, so dashboards never read raw trips.
+
+    Grid cells follow the standard Web Mercator ("slippy map") tiling:
+    at zoom z the world is 2^z x 2^z tiles of 256 px, and each cell is
+    CELL_PX x CELL_PX pixels. Coordinates are projected once, at the finest
+    zoom; coarser cells are obtained with a bit shift, so every zoom level
+    comes out of the same vectorized pass.
+
+Output (per zoom level and endpoint):
+    1. processed-data/heatmaps/{endpoint}_z{zoom}.npz
+       Sparse counts: one entry per non-empty
+       (cell_x, cell_y, member_casual, hour, weekday) combination.
+    2. visualizations/tiles/{endpoint}/{member_casual}/{z}/{x}/{y}.png
+       Pre-rendered density tiles (all hours) for the zooms in PNG_ZOOM_LEVELS.
+"""
+
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import os
+
+# --- CONFIGURATION ---
+input_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
+array_output_dir = 'processed-data/heatmaps'
+tile_output_dir = 'visualizations/tiles'
+output_file = None  # results only
+
+ZOOM_LEVELS = [11, 13, 15]
+PNG_ZOOM_LEVELS = [11, 13]   # zoom 15 is thousands of tiles; serve it from the arrays instead
+TILE_PX = 256
+CELL_PX = 8                  # must be a power of two (keeps zoom levels nested)
+CELLS_PER_TILE = TILE_PX // CELL_PX
+
+ENDPOINTS = {
+    'start': ('start_lat', 'start_lng', 'started_at'),
+    'end': ('end_lat', 'end_lng', 'ended_at'),
+}
+
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def mercator_cells(lat, lng, zoom):
+    """Projects lat/lng (degrees) to integer Web Mercator cell indices at the given zoom."""
+    world_px = TILE_PX * (2 ** zoom)
+    lat_rad = np.radians(np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = (lng + 180.0) / 360.0 * world_px
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0 * world_px
+    return (x // CELL_PX).astype(np.int64), (y // CELL_PX).astype(np.int64)
+
+
+def render_tile(counts, cmap, vmax):
+    """Log-scaled RGBA image for one tile; empty cells are transparent."""
+    scaled = np.log1p(counts) / np.log1p(vmax)
+    rgba = cmap(scaled)
+    rgba[..., 3] = np.where(counts > 0, 0.85, 0.0)
+    return rgba
+
+
+def load():
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    df = pd.read_csv(input_file)
+    print(f"Loaded {len(df)} rows.")
+    return df
+
+
+def run(df):
+    df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
+
+    member_types = np.array(sorted(df['member_casual'].dropna().unique()))
+    n_members = len(member_types)
+    max_zoom = max(ZOOM_LEVELS)
+    cmap = plt.get_cmap('inferno')
+
+    os.makedirs(array_output_dir, exist_ok=True)
+
+    for endpoint, (lat_col, lng_col, time_col) in ENDPOINTS.items():
+        # 1. Drop rides without coordinates for this endpoint (e.g. undocked e-bike ends)
+        valid = df[lat_col].notna() & df[lng_col].notna() & df['member_casual'].notna()
+        points = df[valid]
+        print(f"\n[{endpoint}] {len(points)} rides with coordinates.")
+
+        # 2. Project once at the finest zoom
+        cell_x, cell_y = mercator_cells(points[lat_col].to_numpy(), points[lng_col].to_numpy(), max_zoom)
+        member = np.searchsorted(member_types, points['member_casual'].to_numpy())
+        hour = points[time_col].dt.hour.to_numpy()
+        weekday = points[time_col].dt.dayofweek.to_numpy()
+
+        for zoom in ZOOM_LEVELS:
+            # 3. Coarser zooms are a bit shift of the finest cells
+            shift = max_zoom - zoom
+            zx = cell_x >> shift
+            zy = cell_y >> shift
+
+            # 4. Pack (cell, member, hour, weekday) into one int64 key and count unique keys
+            cells_per_side = (TILE_PX * 2 ** zoom) // CELL_PX
+            key = (((zx * cells_per_side + zy) * n_members + member) * 24 + hour) * 7 + weekday
+            keys, counts = np.unique(key, return_counts=True)
+
+            rest, wd = np.divmod(keys, 7)
+            rest, hr = np.divmod(rest, 24)
+            rest, mem = np.divmod(rest, n_members)
+            cx, cy = np.divmod(rest, cells_per_side)
+
+            array_file = f"{array_output_dir}/{endpoint}_z{zoom}.npz"
+            np.savez_compressed(
+                array_file,
+                zoom=zoom, cell_px=CELL_PX, member_types=member_types,
+                cell_x=cx.astype(np.int32), cell_y=cy.astype(np.int32),
+                member=mem.astype(np.int8), hour=hr.astype(np.int8), weekday=wd.astype(np.int8),
+                count=counts.astype(np.int32),
+            )
+            print(f"  z{zoom}: {len(keys)} non-empty bins -> {array_file}")
+
+            if zoom not in PNG_ZOOM_LEVELS:
+                continue
+
+            # 5. Render tiles (all hours/weekdays) per member type from the sparse aggregates
+            totals = pd.DataFrame({'cx': cx, 'cy': cy, 'member': mem, 'count': counts})
+            totals = totals.groupby(['member', 'cx', 'cy'], as_index=False)['count'].sum()
+            totals['tx'], totals['px'] = np.divmod(totals['cx'].to_numpy(), CELLS_PER_TILE)
+            totals['ty'], totals['py'] = np.divmod(totals['cy'].to_numpy(), CELLS_PER_TILE)
+
+            n_tiles = 0
+            for m, member_totals in totals.groupby('member'):
+                # Shared scale within a zoom/member so neighbouring tiles line up visually
+                vmax = member_totals['count'].max()
+                for (tx, ty), tile in member_totals.groupby(['tx', 'ty']):
+                    grid = np.zeros((CELLS_PER_TILE, CELLS_PER_TILE))
+                    grid[tile['py'].to_numpy(), tile['px'].to_numpy()] = tile['count'].to_numpy()
+                    image = np.kron(render_tile(grid, cmap, vmax), np.ones((CELL_PX, CELL_PX, 1)))
+
+                    tile_dir = f"{tile_output_dir}/{endpoint}/{member_types[m]}/{zoom}/{tx}"
+                    os.makedirs(tile_dir, exist_ok=True)
+                    plt.imsave(f"{tile_dir}/{ty}.png", image)
+                    n_tiles += 1
+            print(f"  z{zoom}: rendered {n_tiles} tiles -> {tile_output_dir}/{endpoint}/")
+
+    print(f"\n--- DONE ---")
+    return df
+
+
+if __name__ == '__main__':
+    print(f"--- Starting Heatmap Aggregation ---")
+    df = load()
+    if df is not None:
+        run(df)
@@ -2,13 +2,13 @@
 Divvy/Bikeshare Data Enrichment Script
 
 Description:
-    This script processes raw bikeshare trip data (CSV format) to add 
-    temporal and spatial features for analysis. It calculates ride duration, 
-    extracts time components, determines if a trip occurred on a weekday, 
+    This script processes raw bikeshare trip data (CSV format) to add
+    temporal and spatial features for analysis. It calculates ride duration,
+    extracts time components, determines if a trip occurred on a weekday,
     flags potential commute trips, and calculates the net displacement distance.
 
 Input:
-    - CSV file containing: ride_id, started_at, ended_at, start_lat, 
+    - CSV file containing: ride_id, started_at, ended_at, start_lat,
       start_lng, end_lat, end_lng, etc.
 
 Output:
@@ -29,13 +29,15 @@ import pandas as pd
 import numpy as np
 import os
 
+from csv_format import DATE_FORMAT
+
 # --- CONFIGURATION ---
 input_file = 'processed-data/0-combined_output.csv'
 output_file = 'processed-data/0-processed_ride_data.csv'
 
 def format_duration(td):
     """
-    Converts a timedelta to a string string "H:MM:SS" 
+    Converts a timedelta to a string string "H:MM:SS"
     where H can exceed 24 hours.
     """
     total_seconds = int(round(td.total_seconds()))
@@ -44,17 +46,27 @@ def format_duration(td):
     seconds = total_seconds % 60
     return f"{hours}:{minutes:02d}:{seconds:02d}"
 
-print(f"--- Starting Script ---")
-
-if not os.path.exists(input_file):
-    print(f"ERROR: '{input_file}' not found.")
-else:
+def haversine_vectorized(lat1, lon1, lat2, lon2):
+    R = 6371.0 # km
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = np.radians(lat2 - lat1)
+    dlambda = np.radians(lon2 - lon1)
+    a = np.sin(dphi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+    return R * c
+
+def load():
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
     df = pd.read_csv(input_file)
     print(f"Loaded {len(df)} rows.")
+    return df
 
+def run(df):
     # 1. Convert timestamps
-    df['started_at'] = pd.to_datetime(df['started_at'])
-    df['ended_at'] = pd.to_datetime(df['ended_at'])
+    df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
 
     # 2. Calculate raw duration (needed for logic)
     # We keep a temporary column for calculations
@@ -75,35 +87,33 @@ else:
 
     # 6. Commute Boolean (Updated Logic)
     print("Identifying commute trips (Weekdays only)...")
-    
+
     start_hour = df['started_at'].dt.hour
     duration_seconds = temp_duration.dt.total_seconds()
-    
+
     # Logic definitions
     is_weekday      = df['Weekday'] == True
     is_morning_rush = (start_hour >= 6) & (start_hour < 10)
     is_evening_rush = (start_hour >= 17) & (start_hour < 20)
     is_short_ride   = duration_seconds < 3600
-    
+
     # Combine: (Morning OR Evening) AND Short AND Weekday
     df['commut'] = (is_morning_rush | is_evening_rush) & is_short_ride & is_weekday
 
     # 7. Calculate Net Distance (Haversine)
     print("Calculating distances...")
-    def haversine_vectorized(lat1, lon1, lat2, lon2):
-        R = 6371.0 # km
-        phi1, phi2 = np.radians(lat1), np.radians(lat2)
-        dphi = np.radians(lat2 - lat1)
-        dlambda = np.radians(lon2 - lon1)
-        a = np.sin(dphi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2)**2
-        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
-        return R * c
-
     df['net_ride_distance_km'] = haversine_vectorized(
-        df['start_lat'], df['start_lng'], 
+        df['start_lat'], df['start_lng'],
         df['end_lat'], df['end_lng']
     )
+    return df
+
+if __name__ == '__main__':
+    print(f"--- Starting Script ---")
+    df = load()
+    if df is not None:
+        df = run(df)
 
-    # 8. Save
-    df.to_csv(output_file, index=False)
-    print(f"--- Done! Saved to '{output_file}' ---")
\ No newline at end of file
+        # 8. Save
+        df.to_csv(output_file, index=False, date_format=DATE_FORMAT)
+        print(f"--- Done! Saved to '{output_file}' ---")
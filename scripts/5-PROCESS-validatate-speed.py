@@ -1,39 +1,66 @@
 import pandas as pd
+import os
 
-file_path = 'processed-data/0-processed_ride_data_with_speed.csv'
-print(f"Validating file: {file_path}")
-df = pd.read_csv(file_path)
+input_file = 'processed-data/0-processed_ride_data_with_speed.csv'
+output_file = None  # report only
 
-print("\n--- VALIDATION REPORT ---")
-
-# CHECK 1: Speed Logic (New)
 # Define "Out of the Ordinary" as > 50km/h (Professional Cyclist / Car speeds)
-speed_limit = 50 
-super_speeders = df[df['speed_kmh'] > speed_limit]
-
-print(f"1. Speed Check (> {speed_limit} km/h):")
-if len(super_speeders) > 0:
-    print(f"   ⚠️  WARNING: Found {len(super_speeders)} rides with suspicious speeds.")
-    print("   Sample of high speed rides:")
-    # showing time, distance and speed to see if it makes sense
-    print(super_speeders[['ride_time', 'net_ride_distance_km', 'speed_kmh']].head(5))
-else:
-    print("   ✅ All speeds look normal (under 50 km/h).")
-
-# CHECK 2: Commute Weekend Logic
-weekend_commutes = df[(df['commut'] == True) & (df['Weekday'] == False)]
-if len(weekend_commutes) == 0:
-    print("\n2. Commute Logic: ✅ SUCCESS (No weekend commutes found).")
-else:
-    print(f"\n2. Commute Logic: ❌ FAILURE ({len(weekend_commutes)} weekend commutes found).")
-
-# CHECK 3: Negative/Zero Durations causing infinite speed
-# If ride_time is 0 but distance > 0, speed would be Inf (or NaN in our script)
-# We check if we have any valid distance but 0 duration
-magic_travel = df[(df['net_ride_distance_km'] > 0.1) & (df['ride_time'] == "0:00:00")]
-if len(magic_travel) > 0:
-    print(f"\n3. Data Logic: ⚠️ Found {len(magic_travel)} rows with Distance but 0 Duration.")
-else:
-    print("\n3. Data Logic: ✅ No instantaneous travel detected.")
-
-print("\n--- End Report ---")
\ No newline at end of file
+speed_limit = 50
+
+def load():
+    print(f"Validating file: {input_file}")
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    return pd.read_csv(input_file)
+
+def aggregate(df):
+    """Counts and samples for the report; partial results from chunks can be summed."""
+    super_speeders = df[df['speed_kmh'] > speed_limit]
+    weekend_commutes = df[(df['commut'] == True) & (df['Weekday'] == False)]
+    # If ride_time is 0 but distance > 0, speed would be Inf (or NaN in our script)
+    magic_travel = df[(df['net_ride_distance_km'] > 0.1) & (df['ride_time'] == "0:00:00")]
+
+    return {
+        'super_speeders': len(super_speeders),
+        # showing time, distance and speed to see if it makes sense
+        'sample_super_speeders': [super_speeders[['ride_time', 'net_ride_distance_km', 'speed_kmh']].head(5)],
+        'weekend_commutes': len(weekend_commutes),
+        'magic_travel': len(magic_travel),
+    }
+
+def report(agg):
+    print("\n--- VALIDATION REPORT ---")
+
+    # CHECK 1: Speed Logic (New)
+    print(f"1. Speed Check (> {speed_limit} km/h):")
+    if agg['super_speeders'] > 0:
+        print(f"   ⚠️  WARNING: Found {agg['super_speeders']} rides with suspicious speeds.")
+        print("   Sample of high speed rides:")
+        print(pd.concat(agg['sample_super_speeders']).head(5))
+    else:
+        print("   ✅ All speeds look normal (under 50 km/h).")
+
+    # CHECK 2: Commute Weekend Logic
+    if agg['weekend_commutes'] == 0:
+        print("\n2. Commute Logic: ✅ SUCCESS (No weekend commutes found).")
+    else:
+        print(f"\n2. Commute Logic: ❌ FAILURE ({agg['weekend_commutes']} weekend commutes found).")
+
+    # CHECK 3: Negative/Zero Durations causing infinite speed
+    # We check if we have any valid distance but 0 duration
+    if agg['magic_travel'] > 0:
+        print(f"\n3. Data Logic: ⚠️ Found {agg['magic_travel']} rows with Distance but 0 Duration.")
+    else:
+        print("\n3. Data Logic: ✅ No instantaneous travel detected.")
+
+    print("\n--- End Report ---")
+
+def run(df):
+    report(aggregate(df))
+    return df
+
+if __name__ == '__main__':
+    df = load()
+    if df is not None:
+        run(df)
@@ -1,16 +1,30 @@
 import pandas as pd
 import numpy as np
+import os
 
-# Load the file
-df = pd.read_csv('0-' \
-'processed-data/0-processed_ride_data_with_speed.csv')
+input_file = 'processed-data/0-processed_ride_data_with_speed.csv'
+output_file = None  # report only
 
-# Ensure we have speed
-# (If you are running this on the raw file, copy the speed calc logic here)
-print("--- SPEED DISTRIBUTION ---")
-print(df['speed_kmh'].describe(percentiles=[.5, .75, .90, .95, .99, .999]))
+def load():
+    # Load the file
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    return pd.read_csv(input_file)
 
-# Show the 'Cliff'
-print("\n--- The Top 1% of Speeds ---")
-top_1_percent = df[df['speed_kmh'] > df['speed_kmh'].quantile(0.99)]
-print(top_1_percent[['ride_time', 'net_ride_distance_km', 'speed_kmh']].sort_values('speed_kmh').head(10))
\ No newline at end of file
+def run(df):
+    # Ensure we have speed
+    # (If you are running this on the raw file, copy the speed calc logic here)
+    print("--- SPEED DISTRIBUTION ---")
+    print(df['speed_kmh'].describe(percentiles=[.5, .75, .90, .95, .99, .999]))
+
+    # Show the 'Cliff'
+    print("\n--- The Top 1% of Speeds ---")
+    top_1_percent = df[df['speed_kmh'] > df['speed_kmh'].quantile(0.99)]
+    print(top_1_percent[['ride_time', 'net_ride_distance_km', 'speed_kmh']].sort_values('speed_kmh').head(10))
+    return df
+
+if __name__ == '__main__':
+    df = load()
+    if df is not None:
+        run(df)
@@ -6,17 +6,48 @@ Thresholds:
 2. Duration: Must be positive (removes negative timestamps)
 3. Magic Travel: Removes rows with Distance > 0 but Time = 0
 4. Commute Logic: Now excludes trips with 0 distance (Round trips)
+
+Rejected rows are not thrown away: they go to a quarantine file with a
+'reject_reason' bitmask (see REASON_* below; a row can have several bits).
+
+Sweep mode (python 7-PROCESS-filter-negative-and-high-speeds.py --sweep):
+    Evaluates many candidate speed / duration / distance thresholds in one
+    pass per threshold type. Each candidate varies one rule while the other
+    rules stay at their defaults. Rows are sorted by the swept value once,
+    and cumulative counts/sums are read off with searchsorted, so no
+    threshold needs a re-run of the cleaning stage. Reports rows kept,
+    commuter % and member/casual averages for each candidate.
 """
 
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+from csv_format import DATE_FORMAT
 
 input_file = 'processed-data/0-processed_ride_data_with_speed.csv'
 output_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
+quarantine_file = 'processed-data/0-quarantined_rides.csv'
+sweep_output_file = 'processed-data/cleaning_threshold_sweep.csv'
 
 # STRICT THRESHOLD (Safe because 99% of data is < 26.2 km/h)
-SPEED_THRESHOLD_KMH = 32.0 
+SPEED_THRESHOLD_KMH = 32.0
+
+# Reject reason bits
+REASON_NEGATIVE_DURATION = 1
+REASON_MAGIC_TRAVEL = 2
+REASON_SPEEDING = 4
+REASON_LABELS = {
+    REASON_NEGATIVE_DURATION: 'Negative Duration',
+    REASON_MAGIC_TRAVEL: 'Magic Travel',
+    REASON_SPEEDING: f'Speed > {SPEED_THRESHOLD_KMH} km/h',
+}
+
+# Candidate thresholds for --sweep
+SWEEP_SPEED_KMH = [20, 22, 24, 26, 28, 30, 32, 35, 40, 45, 50, 60, 80]      # keep speed <= t
+SWEEP_MIN_DURATION_SEC = [0, 10, 30, 60, 90, 120, 180, 300]                # keep duration >= t
+SWEEP_MAX_DISTANCE_KM = [5, 10, 15, 20, 25, 30, 40, 50, np.inf]            # keep distance <= t
 
 def format_duration(td):
     total_seconds = int(round(td.total_seconds()))
@@ -25,12 +56,72 @@ def format_duration(td):
     seconds = total_seconds % 60
     return f"{hours}:{minutes:02d}:{seconds:02d}"
 
-print(f"--- Starting Final Process ---")
+def sweep_thresholds(values, thresholds, keep_below, frame):
+    """
+    Evaluates every threshold in one pass: sort `values` once per member_casual
+    group, take cumulative sums of the metrics, then look up each threshold
+    with searchsorted. keep_below=True keeps values <= t, otherwise values >= t.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    results = pd.DataFrame({'threshold': thresholds})
+    total_kept = np.zeros(len(thresholds))
+    total_commut = np.zeros(len(thresholds))
+    total_has_coordinates = np.zeros(len(thresholds))
 
-if os.path.exists(input_file):
-    df = pd.read_csv(input_file)
-    original_count = len(df)
-    
+    for user_type, group in frame.groupby('member_casual'):
+        group_values = values[group.index]
+        order = np.argsort(group_values, kind='stable')
+        sorted_values = group_values[order]
+
+        # Prefix sums with a leading 0 so prefix[i] = sum of the first i sorted rows
+        def prefix(col):
+            return np.concatenate([[0.0], np.cumsum(group[col].to_numpy(dtype=float)[order])])
+
+        counts = np.arange(len(order) + 1, dtype=float)
+        commut = prefix('commut')
+        duration = prefix('duration_min')
+        distance = prefix('distance_km')
+        has_distance = prefix('has_distance')
+        has_coordinates = prefix('has_coordinates')
+        speed = prefix('speed_kmh')
+        has_speed = prefix('has_speed')
+
+        if keep_below:
+            idx = np.searchsorted(sorted_values, thresholds, side='right')
+            pick = lambda p: p[idx]
+        else:
+            idx = np.searchsorted(sorted_values, thresholds, side='left')
+            pick = lambda p: p[-1] - p[idx]
+
+        kept = pick(counts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            results[f'Rows Kept ({user_type})'] = kept.astype(int)
+            # Legacy rides without coordinates can't be classified, so commute/speed leave them out
+            results[f'Commuter % ({user_type})'] = (pick(commut) / pick(has_coordinates) * 100).round(2)
+            results[f'Avg Duration (min) ({user_type})'] = (pick(duration) / kept).round(2)
+            results[f'Avg Distance (km) ({user_type})'] = (pick(distance) / pick(has_distance)).round(2)
+            results[f'Avg Speed (km/h) ({user_type})'] = (pick(speed) / pick(has_speed)).round(2)
+
+        total_kept += kept
+        total_commut += pick(commut)
+        total_has_coordinates += pick(has_coordinates)
+
+    results.insert(1, 'Rows Kept', total_kept.astype(int))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        results.insert(2, 'Commuter %', (total_commut / total_has_coordinates * 100).round(2))
+    return results
+
+def haversine_vectorized(lat1, lon1, lat2, lon2):
+    R = 6371.0
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = np.radians(lat2 - lat1)
+    dlambda = np.radians(lon2 - lon1)
+    a = np.sin(dphi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+    return R * c
+
+def flag_rows(df):
+    """Recomputes distance/speed/commute fields and sets the 'reject_reason' bitmask on every row."""
     # 1. Flexible Timestamp Conversion
     df['started_at'] = pd.to_datetime(df['started_at'], format='mixed')
     df['ended_at'] = pd.to_datetime(df['ended_at'], format='mixed')
@@ -38,17 +129,8 @@ if os.path.exists(input_file):
     # 2. Calculate Distance & Duration
     temp_duration = df['ended_at'] - df['started_at']
     duration_seconds = temp_duration.dt.total_seconds()
-    
-    # Haversine Distance
-    def haversine_vectorized(lat1, lon1, lat2, lon2):
-        R = 6371.0 
-        phi1, phi2 = np.radians(lat1), np.radians(lat2)
-        dphi = np.radians(lat2 - lat1)
-        dlambda = np.radians(lon2 - lon1)
-        a = np.sin(dphi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2)**2
-        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
-        return R * c
 
+    # Haversine Distance
     df['net_ride_distance_km'] = haversine_vectorized(
         df['start_lat'], df['start_lng'], df['end_lat'], df['end_lng']
     )
@@ -57,57 +139,162 @@ if os.path.exists(input_file):
     # Use epsilon to avoid DivisionByZero errors, but we handle 0 duration later anyway
     duration_hours = duration_seconds / 3600
     df['speed_kmh'] = df['net_ride_distance_km'] / duration_hours.replace(0, np.nan)
-    
+
     # --- FILTERING ---
     print("Applying filters...")
-    
+
     # Filter A: Negative Duration (Fixes the -42 km/h min speed)
     mask_negative = duration_seconds < 0
-    
+
     # Filter B: Magic Travel (Distance > 0, Time = 0)
     mask_magic = (df['net_ride_distance_km'] > 0.01) & (duration_seconds == 0)
-    
+
     # Filter C: Speeders (> 32 km/h)
     # We use fillna(0) for the check so NaNs don't break the boolean logic
     mask_speeders = (df['speed_kmh'].fillna(0) > SPEED_THRESHOLD_KMH)
-    
-    # Combine Filters (Drop if A or B or C is True)
-    rows_to_drop = mask_negative | mask_magic | mask_speeders
-    df_clean = df[~rows_to_drop].copy()
-    
+
+    # Reason bitmask (0 = keep)
+    df['reject_reason'] = (
+        mask_negative * REASON_NEGATIVE_DURATION
+        | mask_magic * REASON_MAGIC_TRAVEL
+        | mask_speeders * REASON_SPEEDING
+    ).astype(int)
+
     # --- FINAL ENRICHMENT ---
-    
-    # Re-calc ride_time formatting on clean data
-    df_clean['ride_time'] = (df_clean['ended_at'] - df_clean['started_at']).apply(format_duration)
-    
+    # Done on every row (not just the kept ones) so quarantined rows carry the same fields
+
+    # Re-calc ride_time formatting
+    df['ride_time'] = temp_duration.apply(format_duration)
+
     # Extract Times
-    df_clean['start_time'] = df_clean['started_at'].dt.time
-    df_clean['end_time'] = df_clean['ended_at'].dt.time
-    
+    df['start_time'] = df['started_at'].dt.time
+    df['end_time'] = df['ended_at'].dt.time
+
     # Weekday & Commute Logic
-    df_clean['Weekday'] = df_clean['started_at'].dt.dayofweek < 5
-    
-    start_hour = df_clean['started_at'].dt.hour
-    is_weekday = df_clean['Weekday'] == True
+    df['Weekday'] = df['started_at'].dt.dayofweek < 5
+
+    start_hour = df['started_at'].dt.hour
+    is_weekday = df['Weekday'] == True
     is_morning = (start_hour >= 6) & (start_hour < 10)
     is_evening = (start_hour >= 17) & (start_hour < 20)
-    
-    clean_duration = (df_clean['ended_at'] - df_clean['started_at']).dt.total_seconds()
-    is_short   = clean_duration < 3600
+
+    is_short   = duration_seconds < 3600
 
     # NEW CONDITION: Distance must be > 0 (excludes Round Trips)
-    is_not_round_trip = df_clean['net_ride_distance_km'] > 0
-    
-    df_clean['commut'] = (is_morning | is_evening) & is_short & is_weekday & is_not_round_trip
-    
+    is_not_round_trip = df['net_ride_distance_km'] > 0
+
+    # Legacy rides with no coordinates can't be classified: commut stays missing, not False
+    df['commut'] = ((is_morning | is_evening) & is_short & is_weekday & is_not_round_trip).where(df['start_lat'].notna())
+    return df
+
+def load():
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    return pd.read_csv(input_file)
+
+def run_chunk(df, state):
+    """
+    Cleans one chunk. `state` carries the row counts across chunks and decides
+    whether the quarantine file is started or appended to; see finish().
+    """
+    first_chunk = not state
+    if first_chunk:
+        state.update({'original': 0, 'clean': 0, 'reasons': {bit: 0 for bit in REASON_LABELS}})
+
+    state['original'] += len(df)
+    df = flag_rows(df)
+
     # Fill NaN speeds with 0 for cleaner file
-    df_clean['speed_kmh'] = df_clean['speed_kmh'].fillna(0)
+    # (except legacy rides with no coordinates at all, whose speed stays unknown)
+    df['speed_kmh'] = df['speed_kmh'].where(df['start_lat'].isna(), df['speed_kmh'].fillna(0))
+
+    # Split kept rows from quarantined rows
+    rows_to_drop = df['reject_reason'] != 0
+    df_clean = df[~rows_to_drop].drop(columns='reject_reason')
+    df_quarantine = df[rows_to_drop]
+    # Fixed timestamp format, so every appended chunk is written the same way
+    df_quarantine.to_csv(quarantine_file, index=False, date_format=DATE_FORMAT,
+                         mode='w' if first_chunk else 'a', header=first_chunk)
+
+    state['clean'] += len(df_clean)
+    for bit in REASON_LABELS:
+        state['reasons'][bit] += int((df_quarantine['reject_reason'] & bit).astype(bool).sum())
+    return df_clean
 
-    # Save
-    df_clean.to_csv(output_file, index=False)
-    
+def finish(state):
     print(f"\n--- Summary ---")
-    print(f"Original Rows: {original_count}")
-    print(f"Dropped Rows:  {original_count - len(df_clean)}")
-    print(f"Final Rows:    {len(df_clean)}")
-    print(f"Saved to:      {output_file}")
\ No newline at end of file
+    print(f"Original Rows:    {state['original']}")
+    print(f"Quarantined Rows: {state['original'] - state['clean']}")
+    for bit, label in REASON_LABELS.items():
+        print(f"    {label}: {state['reasons'][bit]}")
+    print(f"Final Rows:       {state['clean']}")
+    print(f"Quarantine:       {quarantine_file}")
+
+def run(df):
+    state = {}
+    df_clean = run_chunk(df, state)
+    finish(state)
+    return df_clean
+
+def sweep(df):
+    original_count = len(df)
+    df = flag_rows(df)
+
+    # --- THRESHOLD SWEEP ---
+    print("Sweeping thresholds...")
+    duration_seconds = (df['ended_at'] - df['started_at']).dt.total_seconds()
+    mask_negative = (df['reject_reason'] & REASON_NEGATIVE_DURATION) != 0
+    mask_magic = (df['reject_reason'] & REASON_MAGIC_TRAVEL) != 0
+    mask_speeders = (df['reject_reason'] & REASON_SPEEDING) != 0
+
+    # Same speed convention as the cleaned file: 0 when missing, unknown for legacy rows without coordinates
+    speed_kmh = df['speed_kmh'].where(df['start_lat'].isna(), df['speed_kmh'].fillna(0))
+    metrics = pd.DataFrame({
+        'member_casual': df['member_casual'],
+        'commut': df['commut'].astype(float).fillna(0),
+        'duration_min': duration_seconds / 60,
+        'distance_km': df['net_ride_distance_km'].fillna(0),
+        'has_distance': df['net_ride_distance_km'].notna(),
+        'has_coordinates': df['start_lat'].notna(),
+        'speed_kmh': speed_kmh.fillna(0),
+        'has_speed': speed_kmh.notna(),
+    })
+
+    # Each sweep varies one rule; the other rules stay at their defaults
+    sweeps = [
+        ('Max Speed (km/h)', SWEEP_SPEED_KMH, True,
+         ~(mask_negative | mask_magic), df['speed_kmh'].fillna(0)),
+        ('Min Duration (sec)', SWEEP_MIN_DURATION_SEC, False,
+         ~(mask_magic | mask_speeders), duration_seconds),
+        ('Max Distance (km)', SWEEP_MAX_DISTANCE_KM, True,
+         ~(mask_negative | mask_magic | mask_speeders), df['net_ride_distance_km'].fillna(0)),
+    ]
+
+    sweep_tables = []
+    for rule, thresholds, keep_below, base_mask, values in sweeps:
+        base = metrics[base_mask.to_numpy()].reset_index(drop=True)
+        result = sweep_thresholds(values[base_mask].to_numpy(dtype=float), thresholds, keep_below, base)
+        result.insert(2, 'Rows Kept %', (result['Rows Kept'] / original_count * 100).round(3))
+        result.insert(0, 'rule', rule)
+        sweep_tables.append(result)
+
+        print(f"\n--- {rule} ---")
+        print(result[['threshold', 'Rows Kept', 'Rows Kept %', 'Commuter %']
+                     + [c for c in result.columns if c.startswith('Avg Duration')]].to_string(index=False))
+
+    pd.concat(sweep_tables, ignore_index=True).to_csv(sweep_output_file, index=False)
+    print(f"\nSweep saved to: {sweep_output_file}")
+
+if __name__ == '__main__':
+    print(f"--- Starting Final Process ---")
+    df = load()
+    if df is not None:
+        if '--sweep' in sys.argv:
+            sweep(df)
+        else:
+            df_clean = run(df)
+
+            # Save
+            df_clean.to_csv(output_file, index=False, date_format=DATE_FORMAT)
+            print(f"Saved to:         {output_file}")
@@ -1,32 +1,102 @@
 import pandas as pd
+import numpy as np
+import os
+import shutil
+import tempfile
 
-# Load your cleaned file
-df = pd.read_csv('processed-data/0-processed_ride_data_with_speed_cleaned.csv')
+input_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
+output_file = None  # report only
 
-print("--- FINAL AUDIT ---")
+# Duplicate ride_id check in bounded memory: 64-bit hashes of the IDs are spilled
+# to disk, split into 2^PARTITION_BITS files by their top bits. Equal IDs always
+# land in the same file, so each file is checked on its own.
+PARTITION_BITS = 8
+hash_spill_dir = None  # created by the first aggregate() call, removed by report()
 
-# CHECK 1: Test Stations
-# Look for 'TEST', 'REPAIR', 'BASE' in station names (case insensitive)
-# We fillna('') so we don't error out on missing station names
-test_stations = df[df['start_station_name'].fillna('').str.upper().str.contains('TEST|REPAIR|WATSON')]
-print(f"1. Test/Repair Stations found: {len(test_stations)}")
-if len(test_stations) > 0:
-    print(test_stations['start_station_name'].unique())
+def spill_hashes(ride_ids):
+    global hash_spill_dir
+    if hash_spill_dir is None:
+        hash_spill_dir = tempfile.mkdtemp(prefix='divvy-ride-ids-')
 
-# CHECK 2: Rideable Type Consistency
-print("\n2. Rideable Types present:")
-print(df['rideable_type'].value_counts())
-# Tip: If you see 'docked_bike', consider merging it into 'classic_bike'
+    # Hash the text form: a chunk of numeric-only (legacy) IDs is read as int64 and would hash differently
+    hashes = pd.util.hash_pandas_object(ride_ids.astype(str), index=False).to_numpy()
+    partition = hashes >> np.uint64(64 - PARTITION_BITS)
+    order = np.argsort(partition, kind='stable')
+    hashes, partition = hashes[order], partition[order]
+    bounds = np.searchsorted(partition, np.arange(2 ** PARTITION_BITS + 1, dtype=np.uint64))
+    for p in np.flatnonzero(np.diff(bounds)):
+        with open(os.path.join(hash_spill_dir, f"{p:03d}.bin"), 'ab') as f:
+            hashes[bounds[p]:bounds[p + 1]].tofile(f)
 
-# CHECK 3: Duplicate Ride IDs
-# ride_id should be a primary key (unique)
-duplicates = df[df.duplicated(subset=['ride_id'])]
-print(f"\n3. Duplicate Ride IDs: {len(duplicates)}")
+def count_duplicate_hashes():
+    """Checks the spilled hashes one partition at a time, then removes the spill files."""
+    global hash_spill_dir
+    if hash_spill_dir is None:
+        return 0
+    duplicates = 0
+    for name in sorted(os.listdir(hash_spill_dir)):
+        hashes = np.fromfile(os.path.join(hash_spill_dir, name), dtype=np.uint64)
+        duplicates += len(hashes) - len(np.unique(hashes))
+    shutil.rmtree(hash_spill_dir)
+    hash_spill_dir = None
+    return duplicates
 
-# CHECK 4: Geographic Outliers (Chicago is roughly Lat 41-42, Long -87)
-# Checks for 0,0 coordinates or points way outside the city
-outliers = df[(df['start_lat'] < 41) | (df['start_lat'] > 43) | 
-              (df['start_lng'] > -87) | (df['start_lng'] < -88)]
-print(f"\n4. GPS Outliers (Outside Chicago approx area): {len(outliers)}")
+def load():
+    # Load your cleaned file
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    return pd.read_csv(input_file)
 
-print("\n--- Audit Complete ---")
\ No newline at end of file
+def aggregate(df):
+    """Counts for the audit; partial results from chunks can be summed."""
+    # Look for 'TEST', 'REPAIR', 'BASE' in station names (case insensitive)
+    # We fillna('') so we don't error out on missing station names
+    test_stations = df[df['start_station_name'].fillna('').str.upper().str.contains('TEST|REPAIR|WATSON')]
+
+    # Chicago is roughly Lat 41-42, Long -87
+    # Checks for 0,0 coordinates or points way outside the city
+    outliers = df[(df['start_lat'] < 41) | (df['start_lat'] > 43) |
+                  (df['start_lng'] > -87) | (df['start_lng'] < -88)]
+
+    # Hashes go to disk rather than into the partial result; checked once in report()
+    spill_hashes(df['ride_id'])
+
+    return {
+        'test_stations': test_stations['start_station_name'].value_counts(),
+        'rideable_types': df['rideable_type'].value_counts(),
+        'outliers': len(outliers),
+    }
+
+def report(agg):
+    print("--- FINAL AUDIT ---")
+
+    # CHECK 1: Test Stations
+    test_stations = agg['test_stations']
+    print(f"1. Test/Repair Stations found: {int(test_stations.sum())}")
+    if len(test_stations) > 0:
+        print(np.array(sorted(test_stations.index), dtype=object))
+
+    # CHECK 2: Rideable Type Consistency
+    print("\n2. Rideable Types present:")
+    print(agg['rideable_types'].astype(int).sort_values(ascending=False))
+    # Tip: If you see 'docked_bike', consider merging it into 'classic_bike'
+
+    # CHECK 3: Duplicate Ride IDs
+    # ride_id should be a primary key (unique)
+    duplicates = count_duplicate_hashes()
+    print(f"\n3. Duplicate Ride IDs: {duplicates}")
+
+    # CHECK 4: Geographic Outliers
+    print(f"\n4. GPS Outliers (Outside Chicago approx area): {agg['outliers']}")
+
+    print("\n--- Audit Complete ---")
+
+def run(df):
+    report(aggregate(df))
+    return df
+
+if __name__ == '__main__':
+    df = load()
+    if df is not None:
+        run(df)
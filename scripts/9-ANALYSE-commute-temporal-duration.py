@@ -1,49 +1,90 @@
 import pandas as pd
+import os
 
 # Load the CLEANED final file
-file_path = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
-print(f"Loading {file_path}...")
-df = pd.read_csv(file_path)
-
-print("\n--- ANALYSIS: MEMBER vs CASUAL ---")
-
-# 1. Total Counts
-total_rides = len(df)
-grouped = df.groupby('member_casual')
-
-# 2. The "Commuter" Insight
-# We calculate the mean of the boolean (True=1, False=0) to get the %
-commuter_stats = grouped['commut'].agg(['count', 'sum', 'mean']).reset_index()
-commuter_stats.columns = ['User Type', 'Total Rides', 'Commute Trips', 'Commuter %']
-commuter_stats['Commuter %'] = (commuter_stats['Commuter %'] * 100).round(2)
-
-print("\n1. Who is commuting?")
-print(commuter_stats.to_string(index=False))
-
-# 3. Temporal Habits (Weekend vs Weekday)
-# We calculate % of rides that happen on a Weekday
-weekday_stats = grouped['Weekday'].mean().reset_index()
-weekday_stats.columns = ['User Type', 'Weekday %']
-weekday_stats['Weekday %'] = (weekday_stats['Weekday %'] * 100).round(2)
-weekday_stats['Weekend %'] = 100 - weekday_stats['Weekday %']
-
-print("\n2. When do they ride?")
-print(weekday_stats.to_string(index=False))
-
-# 4. Ride Behavior (Duration & Distance)
-# We use numeric conversion for ride_time just for averaging
-df['duration_min'] = (pd.to_datetime(df['ended_at']) - pd.to_datetime(df['started_at'])).dt.total_seconds() / 60
-
-behavior_stats = grouped[['duration_min', 'net_ride_distance_km', 'speed_kmh']].mean().round(2).reset_index()
-behavior_stats.columns = ['User Type', 'Avg Duration (min)', 'Avg Distance (km)', 'Avg Speed (km/h)']
-
-print("\n3. How do they ride?")
-print(behavior_stats.to_string(index=False))
-
-# 5. Bike Preference
-# See if casuals prefer electric bikes more than members
-bike_pref = df.groupby(['member_casual', 'rideable_type']).size().unstack(fill_value=0)
-# Calculate percentage share for each user type
-bike_pref_pct = bike_pref.div(bike_pref.sum(axis=1), axis=0) * 100
-print("\n4. Bike Preference (% of their own rides):")
-print(bike_pref_pct.round(1))
\ No newline at end of file
+input_file = 'processed-data/0-processed_ride_data_with_speed_cleaned.csv'
+output_file = None  # report only
+
+BEHAVIOR_COLUMNS = ['duration_min', 'net_ride_distance_km', 'speed_kmh']
+
+def load():
+    print(f"Loading {input_file}...")
+    if not os.path.exists(input_file):
+        print(f"ERROR: '{input_file}' not found.")
+        return None
+    return pd.read_csv(input_file)
+
+def aggregate(df):
+    """Per-group sums and counts; partial results from chunks can be summed."""
+    # We use numeric conversion for ride_time just for averaging
+    df['duration_min'] = (pd.to_datetime(df['ended_at'], format='mixed') - pd.to_datetime(df['started_at'], format='mixed')).dt.total_seconds() / 60
+
+    # Legacy exports have no coordinates at all, so stage 7 leaves their commut missing;
+    # keep them out of the commuter % instead of counting them as "no"
+    df['commut_known'] = df['commut'].astype(float)
+
+    columns = ['commut_known', 'Weekday'] + BEHAVIOR_COLUMNS
+    grouped = df.groupby('member_casual')
+    return {
+        'sums': grouped[columns].sum(),
+        'counts': grouped[columns].count(),  # non-null counts, so means match pandas' mean()
+        'bike_pref': df.groupby(['member_casual', 'rideable_type']).size(),
+    }
+
+def report(agg):
+    print("\n--- ANALYSIS: MEMBER vs CASUAL ---")
+
+    sums, counts = agg['sums'], agg['counts']
+    means = sums / counts
+
+    # 2. The "Commuter" Insight
+    # We calculate the mean of the boolean (True=1, False=0) to get the %
+    commuter_stats = pd.DataFrame({
+        'User Type': sums.index,
+        'Total Rides': counts['Weekday'].astype(int).to_numpy(),
+        'Commute Trips': sums['commut_known'].astype(int).to_numpy(),
+        'Commuter %': (means['commut_known'] * 100).round(2).to_numpy(),
+    })
+
+    print("\n1. Who is commuting?")
+    print(commuter_stats.to_string(index=False))
+
+    no_coordinates = int((counts['Weekday'] - counts['commut_known']).sum())
+    if no_coordinates > 0:
+        print(f"   Note: {no_coordinates} legacy rides without coordinates are left out of the")
+        print("   commuter %, distance and speed figures (counted in Total Rides only).")
+
+    # 3. Temporal Habits (Weekend vs Weekday)
+    # We calculate % of rides that happen on a Weekday
+    weekday_stats = pd.DataFrame({
+        'User Type': sums.index,
+        'Weekday %': (means['Weekday'] * 100).round(2).to_numpy(),
+    })
+    weekday_stats['Weekend %'] = 100 - weekday_stats['Weekday %']
+
+    print("\n2. When do they ride?")
+    print(weekday_stats.to_string(index=False))
+
+    # 4. Ride Behavior (Duration & Distance)
+    behavior_stats = means[BEHAVIOR_COLUMNS].round(2).reset_index()
+    behavior_stats.columns = ['User Type', 'Avg Duration (min)', 'Avg Distance (km)', 'Avg Speed (km/h)']
+
+    print("\n3. How do they ride?")
+    print(behavior_stats.to_string(index=False))
+
+    # 5. Bike Preference
+    # See if casuals prefer electric bikes more than members
+    bike_pref = agg['bike_pref'].unstack(fill_value=0)
+    # Calculate percentage share for each user type
+    bike_pref_pct = bike_pref.div(bike_pref.sum(axis=1), axis=0) * 100
+    print("\n4. Bike Preference (% of their own rides):")
+    print(bike_pref_pct.round(1))
+
+def run(df):
+    report(aggregate(df))
+    return df
+
+if __name__ == '__main__':
+    df = load()
+    if df is not None:
+        run(df)
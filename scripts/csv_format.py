@@ -0,0 +1,13 @@
+"""
+CSV Timestamp Format (shared by the data-producing stages and divvy.py)
+-----------------------------------------------------------------------
+Description:
+    One format for every timestamp the pipeline writes, so a stage's output
+    file is the same whether the stage ran on its own or through divvy.py.
+    Not a stage itself: the runner only picks up 'N-STAGE-name.py' scripts.
+"""
+
+# Written timestamps always carry microseconds. Left to pandas, each frame picks
+# its own precision, so chunks of whole-second rows would be written differently
+# from the in-memory run (and from each other).
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
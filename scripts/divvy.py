@@ -0,0 +1,287 @@
+"""
+Divvy Pipeline Runner
+---------------------
+Description:
+    Runs any range of the numbered stage scripts in ONE Python process.
+    Each stage script exposes load() / run(df) / output_file; this runner
+    imports them and hands the already-typed DataFrame from one stage to the
+    next in memory, so the CSV is read (and the timestamps parsed) once
+    instead of once per script.
+
+    Only the first selected stage reads its input file. Intermediate CSVs
+    are written only with --write-intermediates; the output of the last
+    selected stage that HAS one is always written (so a full run, or
+    --to 12, still produces the cleaned CSV from stage 7). Report/analysis
+    outputs (charts, summary tables) are written by the stages themselves
+    as usual.
+
+Out-of-core mode (--chunksize N or --memory-budget-mb MB):
+    For data that does not fit in memory (e.g. multi-year history), rows are
+    streamed through the selected stages in fixed-size chunks:
+    - the first stage reads its input chunk by chunk (stage 1 harmonizes
+      legacy schemas per chunk),
+    - transform stages (2, 4, 7) run row-wise on each chunk and append to
+      their output CSV,
+    - report stages (3, 5, 8-12) return partial aggregates per chunk
+      (counts, sums, value histograms) which are summed and reported once
+      at the end, through the same report code as the in-memory path
+      (duration medians come from whole-second histograms, so they are
+      exact to the second rather than to the millisecond).
+    Stages that need every row at once (6, 13-15) are skipped in this mode;
+    run them in-memory on the cleaned output.
+    Memory is bounded by the chunk size (about ROW_MEMORY_FACTOR times the
+    raw size of one chunk) plus each stage's aggregate_memory_bytes, which
+    --memory-budget-mb sets aside before sizing chunks (a budget too small
+    for those plus a 1,000-row chunk is rejected). The duration
+    histograms (stages 10-11) have a fixed maximum size: whole seconds, with
+    rides over a day in one top bucket. The other partials hold one entry
+    per category (user type, bike type, station name, hour, ...). The
+    duplicate ride_id check (stage 8) spills 8-byte hashes to a temporary
+    directory on disk and checks them one partition (1/256 of the rides) at
+    a time.
+
+Usage (from the project root):
+    python scripts/divvy.py                        # every stage, 1 -> last
+    python scripts/divvy.py --from 2 --to 7        # enrich + clean
+    python scripts/divvy.py --from 9               # analysis on the existing cleaned CSV
+    python scripts/divvy.py --write-intermediates  # also save every stage's CSV
+    python scripts/divvy.py --list                 # show available stages
+    python scripts/divvy.py --memory-budget-mb 4000         # out-of-core, all chunkable stages
+    python scripts/divvy.py --to 12 --chunksize 500000      # same, with an explicit chunk size
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib.util
+import io
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+from csv_format import DATE_FORMAT
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Chunk sizing for --memory-budget-mb: measure a sample, then allow for the
+# extra columns and temporary copies the stages create (~4x the raw row size)
+SAMPLE_ROWS = 10_000
+MIN_CHUNK_ROWS = 1_000
+ROW_MEMORY_FACTOR = 4
+AGGREGATE_COPIES = 2
+
+def discover_stages():
+    """Returns {stage_number: script_path} for every 'N-STAGE-name.py' script, in order."""
+    stages = {}
+    for path in glob.glob(os.path.join(SCRIPTS_DIR, '*.py')):
+        match = re.match(r'(\d+)-', os.path.basename(path))
+        if match:
+            stages[int(match.group(1))] = path
+    return dict(sorted(stages.items()))
+
+def import_stage(number, path):
+    # Script names start with a digit and contain dashes, so a plain import won't work
+    spec = importlib.util.spec_from_file_location(f"divvy_stage_{number}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def final_output_stage(modules, selected):
+    """The last selected stage that writes a data file (report-only stages have output_file = None)."""
+    with_output = [number for number in selected if getattr(modules[number], 'output_file', None)]
+    return with_output[-1] if with_output else None
+
+def combine_partials(a, b):
+    """
+    Merges two partial aggregates from report stages: dicts key by key,
+    pandas objects by aligned addition, numbers and lists with '+'.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if isinstance(a, dict):
+        return {key: combine_partials(a.get(key), b.get(key)) for key in list(a) + [k for k in b if k not in a]}
+    if isinstance(a, (pd.Series, pd.DataFrame)):
+        return a.add(b, fill_value=0)
+    return a + b
+
+def stage_kind(module):
+    """How a stage runs on chunks: 'chunk' (stateful transform), 'transform', 'aggregate' or None."""
+    if hasattr(module, 'run_chunk'):
+        return 'chunk'
+    if hasattr(module, 'aggregate'):
+        return 'aggregate'
+    if getattr(module, 'output_file', None):
+        return 'transform'
+    return None
+
+def iter_chunks(module, chunksize):
+    if hasattr(module, 'load_chunks'):
+        return module.load_chunks(chunksize)
+    if not os.path.exists(module.input_file):
+        print(f"ERROR: '{module.input_file}' not found.")
+        return iter(())
+    return pd.read_csv(module.input_file, chunksize=chunksize)
+
+def chunksize_for_budget(module, budget_mb, reserved_bytes=0):
+    """
+    Rows per chunk that keep one chunk (with working copies) under the memory
+    budget, after setting aside `reserved_bytes` for the running aggregates.
+    Stops if the budget can't hold the aggregates plus a MIN_CHUNK_ROWS chunk.
+    """
+    sample = next(iter(iter_chunks(module, SAMPLE_ROWS)), None)
+    if sample is None or sample.empty:
+        return SAMPLE_ROWS
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample) * ROW_MEMORY_FACTOR
+    chunksize = int((budget_mb * 1024 ** 2 - reserved_bytes) / bytes_per_row)
+    if chunksize < MIN_CHUNK_ROWS:
+        needed_mb = (reserved_bytes + MIN_CHUNK_ROWS * bytes_per_row) / 1024 ** 2
+        print(f"ERROR: --memory-budget-mb {budget_mb:g} is too small for these stages: their aggregates "
+              f"need {reserved_bytes / 1024 ** 2:.1f} MB, plus {MIN_CHUNK_ROWS * bytes_per_row / 1024 ** 2:.1f} MB "
+              f"for a chunk of {MIN_CHUNK_ROWS} rows.")
+        print(f"       Use at least {needed_mb:.1f} MB, or set --chunksize directly.")
+        sys.exit(1)
+    return chunksize
+
+def run_chunked(stages, selected, args):
+    modules = {number: import_stage(number, stages[number]) for number in selected}
+
+    # These are all report-only stages, so skipping them doesn't change what later stages see
+    unsupported = [number for number in selected if stage_kind(modules[number]) is None]
+    if unsupported:
+        print(f"NOTE: skipping stage(s) {unsupported}: they need the whole dataset at once.")
+        print("      Run them in-memory on the cleaned output instead (e.g. --from 13 without --chunksize);")
+        print("      the cleaned CSV is written whenever stage 7 is in the range.")
+        selected = [number for number in selected if number not in unsupported]
+        if not selected:
+            sys.exit(1)
+
+    save_stage = final_output_stage(modules, selected)
+    first_module = modules[selected[0]]
+    # Aggregates are merged chunk by chunk, so allow for the running total plus the incoming copy
+    reserved_bytes = sum(AGGREGATE_COPIES * getattr(modules[number], 'aggregate_memory_bytes', 0)
+                         for number in selected)
+    if args.chunksize is not None:
+        chunksize = args.chunksize
+    else:
+        chunksize = chunksize_for_budget(first_module, args.memory_budget_mb, reserved_bytes)
+    print(f"--- Running stages {selected[0]} -> {selected[-1]} out-of-core, {chunksize} rows per chunk ---")
+    pipeline_start = time.perf_counter()
+
+    states = {number: {} for number in selected}
+    partials = {}
+    written = set()
+    total_rows = 0
+
+    for chunk_number, df in enumerate(iter_chunks(first_module, chunksize), start=1):
+        total_rows += len(df)
+        # Per-chunk progress chatter from the stages is suppressed; reports come at the end
+        with contextlib.redirect_stdout(io.StringIO()):
+            for number in selected:
+                module = modules[number]
+                kind = stage_kind(module)
+
+                if kind == 'chunk':
+                    df = module.run_chunk(df, states[number])
+                elif kind == 'transform':
+                    df = module.run(df)
+                else:
+                    partials[number] = combine_partials(partials.get(number), module.aggregate(df))
+                    continue
+
+                if args.write_intermediates or number == save_stage:
+                    df.to_csv(module.output_file, index=False, date_format=DATE_FORMAT,
+                              mode='a' if number in written else 'w', header=number not in written)
+                    written.add(number)
+
+        print(f"  chunk {chunk_number}: {total_rows} rows so far ({time.perf_counter() - pipeline_start:.1f}s)")
+
+    if total_rows == 0:
+        print(f"ERROR: stage {selected[0]} has no input. Stopping.")
+        sys.exit(1)
+
+    # Final reports, in stage order
+    for number in selected:
+        module = modules[number]
+        kind = stage_kind(module)
+        if kind == 'chunk' or kind == 'aggregate':
+            print(f"\n=== Stage {number}: {os.path.basename(stages[number])} ===")
+            if kind == 'chunk':
+                module.finish(states[number])
+            else:
+                module.report(partials[number])
+        if number in written:
+            print(f"Saved stage {number} output to '{module.output_file}'")
+
+    print(f"\n--- Pipeline done in {time.perf_counter() - pipeline_start:.1f}s ---")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Divvy pipeline stages in a single process.")
+    parser.add_argument('--from', dest='first', type=int, default=None, help="first stage number (default: first)")
+    parser.add_argument('--to', dest='last', type=int, default=None, help="last stage number (default: last)")
+    parser.add_argument('--write-intermediates', action='store_true',
+                        help="save each stage's output CSV, not just the last one")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="out-of-core mode: stream this many rows per chunk")
+    parser.add_argument('--memory-budget-mb', type=float, default=None,
+                        help="out-of-core mode: pick the chunk size to fit this budget")
+    parser.add_argument('--list', action='store_true', help="list stages and exit")
+    args = parser.parse_args()
+    if args.chunksize is not None and args.chunksize <= 0:
+        parser.error("--chunksize must be a positive number of rows")
+    if args.memory_budget_mb is not None and args.memory_budget_mb <= 0:
+        parser.error("--memory-budget-mb must be positive")
+
+    stages = discover_stages()
+
+    if args.list:
+        for number, path in stages.items():
+            print(f"{number:>3}  {os.path.basename(path)}")
+        return
+
+    first = args.first if args.first is not None else min(stages)
+    last = args.last if args.last is not None else max(stages)
+    selected = [n for n in stages if first <= n <= last]
+    if not selected:
+        print(f"ERROR: no stages between {first} and {last}.")
+        sys.exit(1)
+
+    if args.chunksize is not None or args.memory_budget_mb is not None:
+        run_chunked(stages, selected, args)
+        return
+
+    print(f"--- Running stages {selected[0]} -> {selected[-1]} in one process ---")
+    pipeline_start = time.perf_counter()
+    modules = {number: import_stage(number, stages[number]) for number in selected}
+    save_stage = final_output_stage(modules, selected)
+    df = None
+
+    for number in selected:
+        module = modules[number]
+        print(f"\n=== Stage {number}: {os.path.basename(stages[number])} ===")
+        stage_start = time.perf_counter()
+
+        # Only the first stage touches disk for its input
+        if df is None:
+            df = module.load()
+            if df is None:
+                print(f"ERROR: stage {number} has no input. Stopping.")
+                sys.exit(1)
+
+        df = module.run(df)
+
+        output_file = getattr(module, 'output_file', None)
+        if output_file and (args.write_intermediates or number == save_stage):
+            df.to_csv(output_file, index=False, date_format=DATE_FORMAT)
+            print(f"Saved {len(df)} rows to '{output_file}'")
+
+        print(f"(stage {number} took {time.perf_counter() - stage_start:.1f}s)")
+
+    print(f"\n--- Pipeline done in {time.perf_counter() - pipeline_start:.1f}s ---")
+
+if __name__ == '__main__':
+    main()
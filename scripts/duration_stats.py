@@ -0,0 +1,52 @@
+"""
+Duration Histograms (shared by stages 10 and 11)
+------------------------------------------------
+Description:
+    Ride duration medians that work the same in-memory and out-of-core.
+    Stages keep a {user_type: count per duration} histogram instead of the
+    rows, so partial histograms from chunks can be summed and the median
+    read off at the end.
+    Not a stage itself: the runner only picks up 'N-STAGE-name.py' scripts.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Chunked duration histograms use whole seconds, and everything longer than
+# a day shares one top bucket (a median never lands there unless half the rides
+# last over a day). That bounds them to one int64 key + count per second of the
+# day per user type, whatever the data; --memory-budget-mb reserves this.
+MAX_HISTOGRAM_SECONDS = 86_400
+HISTOGRAM_MEMORY_BYTES = 2 * (MAX_HISTOGRAM_SECONDS + 1) * 16
+
+def duration_histograms(frame, exact):
+    """
+    {user_type: count per duration in seconds}. exact=True keeps the raw durations
+    (one entry per distinct value, fine for a single in-memory frame); otherwise
+    durations are rounded to whole seconds and capped at MAX_HISTOGRAM_SECONDS,
+    so chunk histograms have a fixed maximum size.
+    """
+    seconds = (frame['ended_at'] - frame['started_at']).dt.total_seconds()
+    if not exact:
+        seconds = seconds.round().clip(0, MAX_HISTOGRAM_SECONDS)
+    histograms = {}
+    for user_type, group_seconds in seconds.dropna().groupby(frame['member_casual']):
+        group_seconds = group_seconds.to_numpy(dtype=float if exact else np.int64)
+        values, counts = np.unique(group_seconds, return_counts=True)
+        histograms[user_type] = pd.Series(counts, index=values)
+    return histograms
+
+def histogram_median(histogram):
+    """
+    Median from a value -> count Series: the same result as Series.median() on
+    the values the histogram was built from (raw durations in-memory, whole
+    seconds for chunked runs).
+    """
+    histogram = histogram[histogram > 0].sort_index()
+    values = histogram.index.to_numpy(dtype=float)
+    cumulative = np.cumsum(histogram.to_numpy())
+    n = cumulative[-1]
+    # 0-based middle ranks; equal for odd n, neighbours for even n
+    low = values[np.searchsorted(cumulative, (n - 1) // 2, side='right')]
+    high = values[np.searchsorted(cumulative, n // 2, side='right')]
+    return (low + high) / 2